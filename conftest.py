@@ -0,0 +1,32 @@
+"""
+Lets pytest run tests of modules that do not need NetBox (reverse zones,
+change sets, fake PowerDNS API) without a NetBox install. Only the plugin
+API imported by the package itself is stubbed, tests that need NetBox skip
+themselves. Under NetBox, use its test runner (manage.py test) instead.
+"""
+import importlib.util
+import sys
+import types
+
+
+def get_plugin_config(plugin_name, parameter, default=None):
+    raise LookupError(f"Plugin settings ({parameter}) are not available without NetBox, pass a SyncConfig")
+
+
+class PluginConfig:
+    pass
+
+
+if importlib.util.find_spec("extras") is None:
+    extras = types.ModuleType("extras")
+    plugins = types.ModuleType("extras.plugins")
+    plugins.PluginConfig = PluginConfig
+    plugins_utils = types.ModuleType("extras.plugins.utils")
+    plugins_utils.get_plugin_config = get_plugin_config
+    extras.plugins = plugins
+    plugins.utils = plugins_utils
+    sys.modules.update({
+        "extras": extras,
+        "extras.plugins": plugins,
+        "extras.plugins.utils": plugins_utils,
+    })
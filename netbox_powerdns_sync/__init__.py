@@ -15,10 +15,24 @@ class NetBoxPowerdnsSyncConfig(PluginConfig):
         "ttl_custom_field": None,
         "powerdns_managed_record_comment": "netbox-powerdns-sync",
         "post_save_enabled": False,
+        "patch_chunk_size": 1000,
+        "api_timeout": 60,
+        "api_pool_size": 10,
+        "api_max_workers": 4,
+        "write_policy": "all",
+        "job_log_level": "info",
+        "job_log_max_entries": 1000,
+        "job_log_overflow": False,
+        "full_sync_interval": None,
+        "outbox_enabled": False,
+        "outbox_batch_size": 1000,
+        "outbox_drain_interval": 1,
     }
 
     def ready(self):
         super().ready()
         import netbox_powerdns_sync.signals
+        from netbox_powerdns_sync.registry import naming_registry
+        naming_registry.load_entry_points()
 
 config = NetBoxPowerdnsSyncConfig
@@ -1,9 +1,12 @@
 from rest_framework import serializers
-from netbox.api.serializers import NetBoxModelSerializer, NestedTagSerializer
+from core.api.nested_serializers import NestedJobSerializer
+from netbox.api.fields import ChoiceField
+from netbox.api.serializers import BaseModelSerializer, NetBoxModelSerializer, NestedTagSerializer
 from dcim.api.serializers import NestedDeviceRoleSerializer
 
 from .nested_serializers import *
-from ..models import ApiServer, Zone
+from ..choices import SyncActionChoices, SyncStatusChoices
+from ..models import ApiServer, SyncAction, Zone
 
 
 class ApiServerSerializer(NetBoxModelSerializer):
@@ -42,3 +45,19 @@ class ZoneSerializer(NetBoxModelSerializer):
             "naming_device_method", "naming_fgrpgroup_method", "tags",
             "custom_fields", "created", "last_updated"
         )
+
+
+class SyncActionSerializer(BaseModelSerializer):
+    url = serializers.HyperlinkedIdentityField(
+        view_name="plugins-api:netbox_powerdns_sync-api:syncaction-detail"
+    )
+    job = NestedJobSerializer(read_only=True)
+    action = ChoiceField(choices=SyncActionChoices, read_only=True)
+    status = ChoiceField(choices=SyncStatusChoices, read_only=True)
+
+    class Meta:
+        model = SyncAction
+        fields = (
+            "id", "url", "display", "job", "action", "zone", "server", "rrset",
+            "status",
+        )
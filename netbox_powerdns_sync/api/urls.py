@@ -7,5 +7,6 @@ app_name = 'netbox_powerdns_sync'
 router = NetBoxRouter()
 router.register('api-servers', views.ApiServerViewSet)
 router.register('zones', views.ZoneViewSet)
+router.register('sync-actions', views.SyncActionViewSet)
 
 urlpatterns = router.urls
@@ -1,6 +1,7 @@
+from rest_framework.viewsets import ReadOnlyModelViewSet
 from netbox.api.viewsets import NetBoxModelViewSet
 from .. import filtersets, models
-from .serializers import ApiServerSerializer, ZoneSerializer
+from .serializers import ApiServerSerializer, SyncActionSerializer, ZoneSerializer
 
 
 class ApiServerViewSet(NetBoxModelViewSet):
@@ -21,3 +22,10 @@ class ZoneViewSet(NetBoxModelViewSet):
     )
     serializer_class = ZoneSerializer
     filterset_class = filtersets.ZoneFilterSet
+
+
+class SyncActionViewSet(ReadOnlyModelViewSet):
+    """ Read-only list of changes made by sync jobs """
+    queryset = models.SyncAction.objects.prefetch_related("job")
+    serializer_class = SyncActionSerializer
+    filterset_class = filtersets.SyncActionFilterSet
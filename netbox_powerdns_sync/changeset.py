@@ -0,0 +1,117 @@
+import powerdns
+from typing import Iterable, Iterator
+
+from .client import patch_rrsets
+from .config import SyncConfig
+from .record import DnsRecord
+
+
+def group_rrsets(records: Iterable[DnsRecord]) -> dict[tuple[str, str], list[DnsRecord]]:
+    """ Group records of a single zone by rrset: (owner name relative to zone, type) """
+    rrsets = {}
+    for record in records:
+        rrsets.setdefault((record.name, record.dns_type), []).append(record)
+    return rrsets
+
+
+def rrset_state(records: Iterable[DnsRecord]) -> tuple[frozenset, int|None]:
+    """ Values and TTL of rrset, as they would be sent to PowerDNS """
+    records = list(records)
+    if not records:
+        return frozenset(), None
+    return frozenset(r.data for r in records), min(r.ttl for r in records)
+
+
+class ChangeSet:
+    """
+    Collects rrset changes (REPLACE or DELETE) for a single zone, so they can
+    be sent to PowerDNS API with one PATCH request (or a few, if chunked)
+    instead of a request per record.
+    """
+    def __init__(self, zone_name: str, config: SyncConfig|None = None) -> None:
+        self.zone_name = zone_name
+        self.config = config or SyncConfig.load()
+        self.rrsets: dict[tuple[str, str], powerdns.RRSet] = {}
+
+    def __len__(self) -> int:
+        return len(self.rrsets)
+
+    def __iter__(self) -> Iterator[powerdns.RRSet]:
+        return iter(self.rrsets.values())
+
+    def replace(self, records: Iterable[DnsRecord]) -> None:
+        """
+        Replace rrset with given records. All records must have the same
+        name & type. PowerDNS uses a single TTL per rrset, the lowest is used.
+        """
+        records = sorted(records, key=lambda r: r.data)
+        if not records:
+            return
+        first = records[0]
+        rrset = powerdns.RRSet(
+            name=first.fqdn,
+            rtype=first.dns_type,
+            records=[r.data for r in records],
+            ttl=min(r.ttl for r in records),
+            changetype="REPLACE",
+            comments=list(self.config.comments),
+        )
+        self.rrsets[(first.name, first.dns_type)] = rrset
+
+    def delete(self, record: DnsRecord) -> None:
+        """ Delete the whole rrset record belongs to """
+        self.rrsets[(record.name, record.dns_type)] = powerdns.RRSet(
+            name=record.fqdn,
+            rtype=record.dns_type,
+            records=[],
+            changetype="DELETE",
+        )
+
+    @classmethod
+    def from_records(cls, zone_name: str, desired: Iterable[DnsRecord], actual: Iterable[DnsRecord], config: SyncConfig|None = None) -> "ChangeSet":
+        """
+        Diff desired records (from netbox) against actual records (from
+        PowerDNS) by rrset (records with same name & type). Each rrset that has
+        different values or TTL is replaced with its full list of desired
+        values and TTL in one go, rrsets without any desired records are
+        deleted. A changed TTL is thus a single REPLACE and not a delete
+        followed by a create.
+        """
+        change_set = cls(zone_name, config)
+        desired_rrsets = group_rrsets(desired)
+        actual_rrsets = group_rrsets(actual)
+        for key, records in desired_rrsets.items():
+            if rrset_state(records) != rrset_state(actual_rrsets.get(key, ())):
+                change_set.replace(records)
+        for key, records in actual_rrsets.items():
+            if key not in desired_rrsets:
+                change_set.delete(records[0])
+        return change_set
+
+    @property
+    def replace_count(self) -> int:
+        return sum(1 for rrset in self if rrset["changetype"] == "REPLACE")
+
+    @property
+    def delete_count(self) -> int:
+        return sum(1 for rrset in self if rrset["changetype"] == "DELETE")
+
+    def chunks(self, size: int|None = None) -> list[list[powerdns.RRSet]]:
+        """ Split rrsets into chunks of at most size rrsets (all in one chunk if size is not set) """
+        rrsets = list(self)
+        if not size:
+            return [rrsets] if rrsets else []
+        return [rrsets[i:i + size] for i in range(0, len(rrsets), size)]
+
+    @staticmethod
+    def send(pdns_zone: powerdns.interface.PDNSZone, rrsets: list[powerdns.RRSet]) -> None:
+        """ Send rrsets to zone on PowerDNS server with a single PATCH request """
+        patch_rrsets(pdns_zone, rrsets)
+
+    @staticmethod
+    def describe(rrset: powerdns.RRSet) -> str:
+        """ One line text representation of rrset for job output """
+        if rrset["changetype"] == "DELETE":
+            return f"{rrset['name']} {rrset['type']}"
+        values = ", ".join(r["content"] for r in rrset["records"])
+        return f"{rrset['name']} {rrset['type']} {rrset['ttl']} {values}"
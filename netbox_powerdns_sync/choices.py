@@ -23,3 +23,25 @@ class NamingFgrpGroupChoices(ChoiceSet):
     CHOICES = [
         ("netbox_powerdns_sync.naming.NamingFGRPGroupName", "Use FHRP Group name only"),
     ]
+
+
+class SyncActionChoices(ChoiceSet):
+    ACTION_REPLACE = "REPLACE"
+    ACTION_DELETE = "DELETE"
+
+    CHOICES = [
+        (ACTION_REPLACE, "Replace", "green"),
+        (ACTION_DELETE, "Delete", "red"),
+    ]
+
+
+class SyncStatusChoices(ChoiceSet):
+    STATUS_OK = "OK"
+    STATUS_FAILED = "FAILED"
+    STATUS_PLANNED = "PLANNED"
+
+    CHOICES = [
+        (STATUS_OK, "OK", "green"),
+        (STATUS_FAILED, "Failed", "red"),
+        (STATUS_PLANNED, "Planned", "blue"),
+    ]
@@ -0,0 +1,156 @@
+import json
+import logging
+import threading
+import powerdns
+import requests
+from powerdns.exceptions import PDNSError
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+
+logger = logging.getLogger("netbox.netbox_powerdns_sync.client")
+
+# requests sent to PowerDNS API by all clients of this process, see api_request_count()
+_request_lock = threading.Lock()
+_request_total = 0
+
+
+def api_request_count() -> int:
+    """ Number of PowerDNS API requests sent by this process so far """
+    return _request_total
+
+
+def get_rrsets(pdns_zone: powerdns.interface.PDNSZone) -> list[dict]:
+    """
+    Read rrsets of zone from server. Unlike PDNSZone.records, the result is
+    not cached on the zone object, so it is never older than the last PATCH.
+    """
+    return pdns_zone.api_client.get(pdns_zone.url)["rrsets"]
+
+
+def patch_rrsets(pdns_zone: powerdns.interface.PDNSZone, rrsets: list[powerdns.RRSet]) -> None:
+    """
+    Send rrset changes of zone with a single PATCH request. Unlike
+    PDNSZone.create_records() & delete_records(), REPLACE and DELETE changes
+    can be mixed.
+    """
+    pdns_zone.api_client.patch(pdns_zone.url, data={"rrsets": rrsets})
+
+
+class PDNSSessionClient(powerdns.PDNSApiClient):
+    """
+    PowerDNS API client that sends requests through a requests.Session, so
+    connections to the server are kept alive and reused from a pool instead
+    of being opened for each request.
+    """
+    def __init__(self, api_endpoint: str, api_key: str, timeout: float|None = None, pool_size: int = 10) -> None:
+        super().__init__(api_endpoint=api_endpoint, api_key=api_key, timeout=timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.request_headers)
+        if api_key:
+            self.session.headers["X-API-Key"] = api_key
+
+    def request(self, path: str, method: str, data: dict|None = None, **kwargs) -> dict|list|str:
+        """ Same as PDNSApiClient.request(), but through the session """
+        if not path.startswith("http://") and not path.startswith("https://"):
+            url = f"{self._api_endpoint}/{path.lstrip('/')}"
+        else:
+            url = path
+        logger.debug("request: %s %s", method, url)
+        global _request_total
+        with _request_lock:
+            _request_total += 1
+        response = self.session.request(
+            method,
+            url,
+            data=json.dumps(data or {}),
+            timeout=self._timeout,
+            verify=self._verify,
+            **kwargs
+        )
+        if response.status_code in (200, 201):
+            return response.json()
+        if response.status_code == 204:
+            return ""
+        if response.status_code == 404:
+            message = "Not found"
+        else:
+            try:
+                message = self._get_error(response=response.json())
+            except Exception:
+                message = response.text
+        raise PDNSError(url=response.url, status_code=response.status_code, message=message)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class ClientRegistry:
+    """
+    Process wide registry of API clients, keyed by ApiServer primary key.
+    A client is rebuilt when URL or token of ApiServer changes and dropped
+    when ApiServer is saved or deleted (see signals).
+
+    Data about the PowerDNS server (first entry of /servers) is kept with the
+    client so it is only fetched once. A new PDNSServer object is returned
+    for every call, so zone lists and zone details cached by python-powerdns
+    do not outlive a single task.
+
+    Transport adapters added with mount() are mounted on sessions of all
+    clients, e.g. to answer API requests with fake_pdns.FakePowerDNSAdapter.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[int, dict] = {}
+        self._mounts: dict[str, BaseAdapter] = {}
+
+    def get_server(self, pk: int, api_url: str, api_token: str, timeout: float|None = None, pool_size: int = 10) -> powerdns.interface.PDNSServer:
+        key = (api_url, api_token, timeout, pool_size)
+        with self._lock:
+            entry = self._entries.get(pk)
+            if entry is None or entry["key"] != key:
+                if entry is not None:
+                    entry["client"].close()
+                entry = {
+                    "key": key,
+                    "client": PDNSSessionClient(api_url, api_token, timeout=timeout, pool_size=pool_size),
+                    "server_data": None,
+                }
+                for prefix, adapter in self._mounts.items():
+                    entry["client"].session.mount(prefix, adapter)
+                self._entries[pk] = entry
+        client = entry["client"]
+        if entry["server_data"] is None:
+            entry["server_data"] = client.get("/servers")[0]
+        return powerdns.interface.PDNSServer(client, entry["server_data"])
+
+    def mount(self, prefix: str, adapter: BaseAdapter) -> None:
+        """
+        Send requests to URLs starting with prefix through adapter. Existing
+        clients are dropped, so server data is fetched through adapter too.
+        """
+        with self._lock:
+            self._mounts[prefix] = adapter
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            entry["client"].close()
+
+    def unmount(self, prefix: str) -> None:
+        with self._lock:
+            self._mounts.pop(prefix, None)
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            entry["client"].close()
+
+    def invalidate(self, pk: int) -> None:
+        with self._lock:
+            entry = self._entries.pop(pk, None)
+        if entry is not None:
+            entry["client"].close()
+
+
+client_registry = ClientRegistry()
@@ -0,0 +1,151 @@
+import logging
+import threading
+from datetime import timedelta
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+from django.dispatch import receiver
+from django.utils import timezone
+from core.choices import JobStatusChoices
+from core.models import Job
+from extras.plugins.utils import get_plugin_config
+from ipam.models import IPAddress
+
+from .constants import JOB_NAME_OUTBOX, PLUGIN_NAME
+from .jobs import PowerdnsTaskIP, PowerdnsTaskOutbox
+from .models import OutboxEntry
+
+
+logger = logging.getLogger("netbox.netbox_powerdns_sync.coalesce")
+
+# batches of this thread's open transactions, by database alias. A batch is
+# removed when its transaction commits (see IPUpdateBatch.flush()), batches
+# of rolled back transactions are dropped by _current_batch() and at start
+# of each request.
+_local = threading.local()
+
+
+def _batches() -> dict[str, "IPUpdateBatch"]:
+    batches = getattr(_local, "batches", None)
+    if batches is None:
+        batches = _local.batches = {}
+    return batches
+
+
+class IPUpdateBatch:
+    """
+    IP addresses changed within one database transaction (usually a single
+    request, e.g. a bulk edit). When the transaction commits, all of them
+    are updated by one job instead of a job per address.
+
+    With outbox enabled, each address is written to outbox in the same
+    transaction instead, and on commit the outbox drainer job is started if
+    it is not already queued.
+    """
+    def __init__(self, ip: IPAddress, name: str, user=None, using: str = DEFAULT_DB_ALIAS) -> None:
+        # job is attached to first address, others are passed as ip_pks
+        self.ip = ip
+        self.name = name
+        self.user = user
+        self.using = using
+        # savepoints open when batch was started, see _current_batch()
+        self.savepoint_ids = tuple(transaction.get_connection(using).savepoint_ids)
+        self.ip_pks : dict[int, None] = {}
+        self.outbox = get_plugin_config(PLUGIN_NAME, "outbox_enabled")
+
+    def add(self, ip: IPAddress, name: str) -> None:
+        if ip.pk in self.ip_pks:
+            return
+        self.ip_pks[ip.pk] = None
+        if self.outbox:
+            OutboxEntry.objects.create(ip_id=ip.pk, reason=name)
+
+    def flush(self) -> None:
+        batches = _batches()
+        if batches.get(self.using) is self:
+            del batches[self.using]
+        if not self.ip_pks:
+            return
+        if self.outbox:
+            start_outbox_drainer()
+            return
+        logger.debug(f"Enqueuing update of {len(self.ip_pks)} IP addresses")
+        Job.enqueue(
+            PowerdnsTaskIP.run_update_ip,
+            instance=self.ip,
+            name=self.name,
+            user=self.user,
+            ip_pks=list(self.ip_pks),
+        )
+
+
+def _current_batch(using: str = DEFAULT_DB_ALIAS) -> IPUpdateBatch|None:
+    """
+    Return batch of current transaction. A batch is only reused while its
+    transaction is open and savepoints open when it was started are still
+    open. Otherwise its transaction (or savepoint) was rolled back, taking
+    its on_commit callback along, and the batch is dropped.
+    """
+    batches = _batches()
+    batch = batches.get(using)
+    if batch is None:
+        return None
+    connection = transaction.get_connection(using)
+    savepoint_ids = tuple(connection.savepoint_ids)
+    if connection.in_atomic_block and savepoint_ids[:len(batch.savepoint_ids)] == batch.savepoint_ids:
+        return batch
+    del batches[using]
+    return None
+
+
+@receiver(request_started)
+def clear_batches(**kwargs) -> None:
+    """
+    Drop batches left over from rolled back transactions of previous request
+    on this thread, they can not be told apart from a new transaction
+    """
+    _batches().clear()
+
+
+def enqueue_ip_update(ip: IPAddress, name: str, user=None) -> None:
+    """
+    Update DNS records of ip once the current transaction commits. All
+    addresses changed in the same transaction are deduplicated and updated
+    by a single job. Outside of a transaction the job is enqueued right away.
+    """
+    batch = _current_batch()
+    if batch is not None:
+        batch.add(ip, name)
+        return
+    batch = IPUpdateBatch(ip, name, user)
+    batch.add(ip, name)
+    _batches()[batch.using] = batch
+    transaction.on_commit(batch.flush)
+
+
+def start_outbox_drainer() -> None:
+    """
+    Enqueue outbox drainer job unless one is already waiting, running or
+    scheduled to run within outbox_drain_interval (a drainer scheduled for a
+    later retry does not count). A running drainer looks for entries added
+    meanwhile when it finishes. Failures (e.g. Redis not available) are only
+    logged, entries stay in outbox and are processed by the next drainer run.
+    """
+    interval = get_plugin_config(PLUGIN_NAME, "outbox_drain_interval")
+    soon = timezone.now() + timedelta(minutes=interval or 0)
+    active = Job.objects.filter(name=JOB_NAME_OUTBOX).filter(
+        Q(status__in=(JobStatusChoices.STATUS_PENDING, JobStatusChoices.STATUS_RUNNING))|
+        Q(status=JobStatusChoices.STATUS_SCHEDULED, scheduled__lte=soon)
+    )
+    if active.exists():
+        return
+    try:
+        Job.enqueue(
+            PowerdnsTaskOutbox.run_drain_outbox,
+            # job is not bound to any object, only to outbox entry type
+            instance=OutboxEntry(),
+            name=JOB_NAME_OUTBOX,
+            interval=interval,
+        )
+    except Exception as e:
+        logger.error(f"Unable to start outbox drainer job: {e}")
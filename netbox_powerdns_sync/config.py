@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from powerdns import Comment, RRSet
+from extras.plugins.utils import get_plugin_config
+
+from .constants import PLUGIN_NAME, FAMILY_TYPES, PTR_TYPE
+
+
+@dataclass(frozen=True)
+class SyncConfig:
+    """
+    Snapshot of plugin settings, taken once per job with load() and passed to
+    code that runs for every address or record, so settings are not looked up
+    (and derived values rebuilt) over and over.
+    """
+    ttl_custom_field: str|None
+    managed_comment: str|None
+    # comments sent with every rrset, shared by all rrsets of a job
+    comments: tuple[Comment, ...]
+    managed_types: frozenset[str]
+    patch_chunk_size: int|None
+    api_max_workers: int
+    write_policy: str
+    job_log_level: str
+    job_log_max_entries: int|None
+    job_log_overflow: bool
+    full_sync_interval: int|None
+    outbox_enabled: bool
+    outbox_batch_size: int
+
+    @classmethod
+    def load(cls) -> "SyncConfig":
+        comment = get_plugin_config(PLUGIN_NAME, "powerdns_managed_record_comment")
+        return cls(
+            ttl_custom_field=get_plugin_config(PLUGIN_NAME, "ttl_custom_field"),
+            managed_comment=comment,
+            comments=(Comment(comment),) if comment else (),
+            managed_types=frozenset([PTR_TYPE, *FAMILY_TYPES.values()]),
+            patch_chunk_size=get_plugin_config(PLUGIN_NAME, "patch_chunk_size"),
+            api_max_workers=get_plugin_config(PLUGIN_NAME, "api_max_workers") or 1,
+            write_policy=get_plugin_config(PLUGIN_NAME, "write_policy"),
+            job_log_level=get_plugin_config(PLUGIN_NAME, "job_log_level"),
+            job_log_max_entries=get_plugin_config(PLUGIN_NAME, "job_log_max_entries"),
+            job_log_overflow=get_plugin_config(PLUGIN_NAME, "job_log_overflow"),
+            full_sync_interval=get_plugin_config(PLUGIN_NAME, "full_sync_interval"),
+            outbox_enabled=get_plugin_config(PLUGIN_NAME, "outbox_enabled"),
+            outbox_batch_size=get_plugin_config(PLUGIN_NAME, "outbox_batch_size"),
+        )
+
+
+def can_manage_record(record: dict|RRSet, config: SyncConfig|None = None) -> bool:
+    """
+    Check if record from powerdns is of supported type and if using comments,
+    check if it's correct
+    """
+    config = config or SyncConfig.load()
+    if record["type"] not in config.managed_types:
+        return False
+    if config.managed_comment:
+        for record_comment in record["comments"]:
+            if record_comment["content"] == config.managed_comment:
+                return True
+        return False
+    return True
+
+
+def get_managed_comment(config: SyncConfig|None = None) -> list:
+    """
+    Return powerdns RRset comment if set in confiuration
+    """
+    return list((config or SyncConfig.load()).comments)
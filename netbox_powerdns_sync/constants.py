@@ -9,7 +9,14 @@ PTR_ZONE_SUFFIXES = (
     "ip6.arpa."
 )
 
+WRITE_POLICY_ALL = "all"
+WRITE_POLICY_QUORUM = "quorum"
+
 JOB_NAME_IP = "PowerDNS IP Address update"
 JOB_NAME_INTERFACE = "PowerDNS Interface update"
 JOB_NAME_DEVICE = "PowerDNS Device update"
 JOB_NAME_SYNC = "PowerDNS zone sync"
+JOB_NAME_SYNC_ALL = "PowerDNS sync of all zones"
+JOB_NAME_SYNC_PLAN = "PowerDNS zone sync plan"
+JOB_NAME_SYNC_ALL_PLAN = "PowerDNS sync plan of all zones"
+JOB_NAME_OUTBOX = "PowerDNS outbox drain"
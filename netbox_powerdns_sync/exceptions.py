@@ -6,6 +6,10 @@ class PowerdnsSyncNoZoneFound(Exception):
     pass
 
 
+class PowerdnsSyncNamingError(Exception):
+    pass
+
+
 class PowerdnsSyncServerError(Exception):
     pass
 
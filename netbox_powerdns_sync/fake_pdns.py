@@ -0,0 +1,249 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from urllib.parse import unquote, urlsplit
+
+
+logger = logging.getLogger("netbox.netbox_powerdns_sync.fake_pdns")
+
+PATH_RE = re.compile(r"^.*?/servers(?:/(?P<server>[^/]+)(?P<zones>/zones(?:/(?P<zone>[^/]+))?)?)?/?$")
+
+HTTP_REASONS = {
+    200: "OK",
+    204: "No Content",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    422: "Unprocessable Entity",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+}
+
+
+class FakePowerDNS:
+    """
+    In-memory state of a PowerDNS authoritative server: zones and their
+    rrsets, as returned and changed by the subset of PowerDNS HTTP API the
+    plugin uses (see FakePowerDNSAdapter).
+    """
+    def __init__(self, server_id: str = "localhost", zones: list[str]|None = None) -> None:
+        self.server_id = server_id
+        self.lock = threading.Lock()
+        # zone name -> {(rrset name, type): rrset}
+        self.zones : dict[str, dict[tuple[str, str], dict]] = {}
+        for zone in zones or ():
+            self.add_zone(zone)
+
+    @property
+    def server_data(self) -> dict:
+        return {
+            "type": "Server",
+            "id": self.server_id,
+            "daemon_type": "authoritative",
+            "version": "4.8.0",
+            "url": f"/api/v1/servers/{self.server_id}",
+            "config_url": f"/api/v1/servers/{self.server_id}/config{{/config_setting}}",
+            "zones_url": f"/api/v1/servers/{self.server_id}/zones{{/zone}}",
+        }
+
+    def add_zone(self, name: str, rrsets: list[dict]|None = None) -> None:
+        """ Add zone with optional rrsets (dicts as in PowerDNS API, changetype is ignored) """
+        with self.lock:
+            records = self.zones.setdefault(name, {})
+            for rrset in rrsets or ():
+                records[(rrset["name"], rrset["type"])] = self._stored_rrset(rrset)
+
+    def rrsets(self, zone_name: str) -> list[dict]:
+        with self.lock:
+            return [dict(rrset) for rrset in self.zones[zone_name].values()]
+
+    def zone_data(self, name: str, rrsets: bool = False) -> dict:
+        data = {
+            "id": name,
+            "name": name,
+            "url": f"/api/v1/servers/{self.server_id}/zones/{name}",
+            "kind": "Native",
+            "serial": 1,
+        }
+        if rrsets:
+            data["rrsets"] = [dict(rrset) for rrset in self.zones[name].values()]
+        return data
+
+    @staticmethod
+    def _stored_rrset(rrset: dict) -> dict:
+        return {
+            "name": rrset["name"],
+            "type": rrset["type"],
+            "ttl": rrset.get("ttl", 3600),
+            "records": [
+                {"content": r["content"], "disabled": r.get("disabled", False)}
+                for r in rrset.get("records", [])
+            ],
+            "comments": list(rrset.get("comments", [])),
+        }
+
+    def patch_zone(self, name: str, rrsets: list[dict]) -> str|None:
+        """
+        Apply REPLACE & DELETE rrset changes to zone. Like PowerDNS, changes
+        are validated first and either all are applied or none. Returns error
+        message if changes were rejected.
+        """
+        seen = set()
+        for rrset in rrsets:
+            key = (rrset.get("name"), rrset.get("type"))
+            if not key[0] or not key[1]:
+                return "RRset is missing name or type"
+            if key in seen:
+                return f"Duplicate RRset {key[0]} IN {key[1]}"
+            seen.add(key)
+            if key[0] != name and not key[0].endswith("." + name):
+                return f"RRset {key[0]} IN {key[1]}: Name is out of zone"
+            if rrset.get("changetype") not in ("REPLACE", "DELETE"):
+                return f"Changetype not understood: {rrset.get('changetype')}"
+        with self.lock:
+            records = self.zones[name]
+            for rrset in rrsets:
+                key = (rrset["name"], rrset["type"])
+                if rrset["changetype"] == "DELETE" or not rrset.get("records"):
+                    records.pop(key, None)
+                else:
+                    records[key] = self._stored_rrset(rrset)
+        return None
+
+
+class FakePowerDNSAdapter(BaseAdapter):
+    """
+    requests transport adapter answering PowerDNS API requests from a
+    FakePowerDNS in the same process, without any network. Mount it on the
+    API client sessions with client_registry.mount(), e.g. for ApiServer
+    with api_url http://pdns.test/api/v1:
+
+        client_registry.mount("http://pdns.test/", FakePowerDNSAdapter(FakePowerDNS(zones=["example.com."])))
+
+    Supported are server list, zone list, zone GET (with rrsets) and zone
+    PATCH of rrsets. Each request can be delayed by latency seconds (plus
+    up to jitter), fail with status 500 with probability error_rate or be
+    rejected with 429 when more than rate_limit requests per second are
+    sent. A wrong X-API-Key (when api_key is set) is rejected with 401.
+    """
+    def __init__(
+        self,
+        backend: FakePowerDNS|None = None,
+        api_key: str|None = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: float|None = None,
+        seed: int|None = None,
+    ) -> None:
+        super().__init__()
+        self.backend = backend or FakePowerDNS()
+        self.api_key = api_key
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens = rate_limit or 0.0
+        self.last_refill = time.monotonic()
+        # number of responses per (method, status code)
+        self.stats : dict[tuple[str, int], int] = {}
+
+    def send(self, request: PreparedRequest, stream=False, timeout=None, verify=True, cert=None, proxies=None) -> Response:
+        with self.lock:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = self.error_rate and self.random.random() < self.error_rate
+            limited = not self._take_token()
+        if delay:
+            time.sleep(delay)
+        if self.api_key is not None and request.headers.get("X-API-Key") != self.api_key:
+            status, body = 401, "Unauthorized"
+        elif limited:
+            status, body = 429, {"error": "Rate limit exceeded"}
+        elif failed:
+            status, body = 500, {"error": "Injected failure"}
+        else:
+            status, body = self.handle(request)
+        with self.lock:
+            key = (request.method, status)
+            self.stats[key] = self.stats.get(key, 0) + 1
+        logger.debug("%s %s: %s", request.method, request.url, status)
+        return self.build_response(request, status, body)
+
+    def close(self) -> None:
+        pass
+
+    def _take_token(self) -> bool:
+        """ Token bucket of rate_limit requests per second, holding at most one second of requests """
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.rate_limit, self.tokens + (now - self.last_refill) * self.rate_limit)
+        self.last_refill = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def handle(self, request: PreparedRequest) -> tuple[int, object]:
+        """ Route request to backend, returns status code and JSON body (None for no content) """
+        match = PATH_RE.match(unquote(urlsplit(request.url).path))
+        if not match:
+            return 404, {"error": "Not Found"}
+        server, zone = match.group("server"), match.group("zone")
+        backend = self.backend
+        if server is not None and server != backend.server_id:
+            return 404, {"error": "Not Found"}
+        if zone is not None and zone not in backend.zones:
+            return 404, {"error": f"Could not find domain '{zone}'"}
+        method = request.method
+        if server is None:
+            if method == "GET":
+                return 200, [backend.server_data]
+        elif not match.group("zones"):
+            if method == "GET":
+                return 200, backend.server_data
+        elif zone is None:
+            if method == "GET":
+                with backend.lock:
+                    return 200, [backend.zone_data(name) for name in backend.zones]
+        elif method == "GET":
+            with backend.lock:
+                return 200, backend.zone_data(zone, rrsets=True)
+        elif method == "PATCH":
+            try:
+                rrsets = json.loads(request.body or "{}").get("rrsets", [])
+            except (ValueError, AttributeError):
+                return 400, {"error": "Invalid JSON"}
+            error = backend.patch_zone(zone, rrsets)
+            if error:
+                return 422, {"error": error}
+            return 204, None
+        return 405, {"error": "Method Not Allowed"}
+
+    @staticmethod
+    def build_response(request: PreparedRequest, status: int, body: object) -> Response:
+        response = Response()
+        response.status_code = status
+        response.reason = HTTP_REASONS.get(status, "")
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        if body is None:
+            response._content = b""
+        elif isinstance(body, str):
+            response._content = body.encode()
+            response.headers["Content-Type"] = "text/plain"
+        else:
+            response._content = json.dumps(body).encode()
+            response.headers["Content-Type"] = "application/json"
+        if status == 429:
+            response.headers["Retry-After"] = "1"
+        return response
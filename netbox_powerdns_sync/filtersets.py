@@ -1,14 +1,16 @@
 import django_filters
 from django.db.models import Q
 from dcim.models import DeviceRole
-from netbox.filtersets import NetBoxModelFilterSet
+from core.models import Job
+from netbox.filtersets import BaseFilterSet, NetBoxModelFilterSet
 from utilities import filters
 
-from .choices import NamingDeviceChoices, NamingIpChoices, NamingFgrpGroupChoices
+from .choices import NamingDeviceChoices, NamingIpChoices, NamingFgrpGroupChoices, SyncActionChoices, SyncStatusChoices
 from .models import *
 
 __all__ = (
     "ApiServerFilterSet",
+    "SyncActionFilterSet",
     "ZoneFilterSet",
 )
 
@@ -85,3 +87,34 @@ class ZoneFilterSet(NetBoxModelFilterSet):
     class Meta:
         model = Zone
         fields = ["id", "name", "description", "enabled"]
+
+
+class SyncActionFilterSet(BaseFilterSet):
+    q = django_filters.CharFilter(
+        method="search",
+        label="Search",
+    )
+    job_id = django_filters.ModelMultipleChoiceFilter(
+        queryset=Job.objects.all(),
+        field_name="job",
+        label="Job (ID)",
+    )
+    action = django_filters.MultipleChoiceFilter(
+        choices=SyncActionChoices,
+    )
+    status = django_filters.MultipleChoiceFilter(
+        choices=SyncStatusChoices,
+    )
+
+    def search(self, queryset, name, value):
+        if not value.strip():
+            return queryset
+        return queryset.filter(
+            Q(rrset__icontains=value)|
+            Q(zone__icontains=value)|
+            Q(server__icontains=value)
+        )
+
+    class Meta:
+        model = SyncAction
+        fields = ["id", "zone", "server"]
@@ -1,16 +1,18 @@
 from django import forms
 from dcim.models import DeviceRole
 from netbox.forms import NetBoxModelFilterSetForm
-from utilities.forms import BOOLEAN_WITH_BLANK_CHOICES
+from extras.forms.mixins import SavedFiltersMixin
+from utilities.forms import BOOLEAN_WITH_BLANK_CHOICES, FilterForm
 from utilities.forms.fields import DynamicModelMultipleChoiceField, TagFilterField
 
-from ..choices import NamingDeviceChoices, NamingFgrpGroupChoices, NamingIpChoices
+from ..choices import NamingDeviceChoices, NamingFgrpGroupChoices, NamingIpChoices, SyncActionChoices, SyncStatusChoices
 from ..fields import MatchTagFilterField
-from ..models import ApiServer, Zone
+from ..models import ApiServer, SyncAction, Zone
 
 
 __all__ = (
     "ApiServerFilterForm",
+    "SyncActionFilterForm",
     "ZoneFilterForm",
 )
 
@@ -80,3 +82,26 @@ class ZoneFilterForm(NetBoxModelFilterSetForm):
         choices=NamingFgrpGroupChoices,
     )
     tag = TagFilterField(model)
+
+
+class SyncActionFilterForm(SavedFiltersMixin, FilterForm):
+    model = SyncAction
+
+    job_id = forms.IntegerField(
+        required=False,
+        label="Job (ID)",
+    )
+    zone = forms.CharField(
+        required=False,
+    )
+    server = forms.CharField(
+        required=False,
+    )
+    action = forms.MultipleChoiceField(
+        required=False,
+        choices=SyncActionChoices,
+    )
+    status = forms.MultipleChoiceField(
+        required=False,
+        choices=SyncStatusChoices,
+    )
@@ -9,11 +9,23 @@ class ZoneScheduleForm(ScriptForm):
     zones = DynamicModelMultipleChoiceField(
         queryset=Zone.objects.enabled(),
         query_params={"enabled": True},
+        required=False,
         help_text="Only enabled zones can be scheduled",
     )
+    all_zones = forms.BooleanField(
+        required=False,
+        label="All zones",
+        help_text="Sync all enabled zones in a single job instead of a job per zone",
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields.pop("_commit")
         self.fields["_schedule_at"].help_text = self.fields["_schedule_at"].help_text.replace("script", "sync")
         self.fields["_interval"].help_text = self.fields["_interval"].help_text.replace("script", "sync")
+
+    def clean(self):
+        super().clean()
+        if not self.cleaned_data.get("zones") and not self.cleaned_data.get("all_zones"):
+            raise forms.ValidationError("Select zones to sync or all zones")
+        return self.cleaned_data
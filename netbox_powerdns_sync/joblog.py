@@ -0,0 +1,179 @@
+import heapq
+import logging
+import time
+from collections import deque
+from core.models import Job
+from extras.choices import LogLevelChoices
+
+from .models import JobLogEntry
+
+
+logger = logging.getLogger("netbox.netbox_powerdns_sync.joblog")
+
+# log levels from least to most severe, messages below threshold are only counted
+LOG_LEVEL_ORDER = {
+    LogLevelChoices.LOG_DEFAULT: 0,
+    LogLevelChoices.LOG_SUCCESS: 1,
+    LogLevelChoices.LOG_INFO: 1,
+    LogLevelChoices.LOG_WARNING: 2,
+    LogLevelChoices.LOG_FAILURE: 3,
+}
+
+# number of overflow entries written with one query
+OVERFLOW_BATCH_SIZE = 500
+
+# seconds between saves of job.data while job is running, so progress can
+# be followed in the UI
+SAVE_INTERVAL = 5
+
+# max. number of log entries or output rows returned by one tail request
+TAIL_LIMIT = 500
+
+
+class JobLogSink:
+    """
+    Keeps job.data small on large syncs. Stored in job.data are:
+      - log: messages at or above level threshold, at most max_entries of
+        them, except warnings and failures, which are always kept. The first
+        half are the first messages of the job, the other half the latest
+        ones, so the end of the job (and why it failed) is never lost.
+      - output: the first max_entries output rows
+      - counters: number of messages per category (e.g. skipped_no_zone)
+      - log_total, log_dropped, output_total: counts of all messages and rows
+    Each log entry has its sequence number. With overflow enabled, messages
+    pushed out of the latest ones are stored to JobLogEntry table instead of
+    being dropped.
+    """
+    def __init__(self, job: Job, level: str = LogLevelChoices.LOG_INFO, max_entries: int|None = 1000, overflow: bool = False) -> None:
+        self.job = job
+        self.threshold = LOG_LEVEL_ORDER.get(level, 0)
+        self.max_entries = max_entries
+        self.overflow = overflow
+        self.pending : list[JobLogEntry] = []
+        self.last_save = time.monotonic()
+        # first messages, warnings & failures: stored in job.data for good
+        self.kept : list[dict] = []
+        # latest other messages and their categories, oldest are pushed out
+        self.latest : deque[tuple[dict, str]] = deque()
+        if max_entries is not None:
+            self.head_size = max_entries - max_entries // 2
+            self.latest_size = max_entries // 2
+        else:
+            self.head_size = self.latest_size = None
+
+    @property
+    def data(self) -> dict:
+        if not self.job.data:
+            self.job.data = dict()
+        return self.job.data
+
+    def count(self, category: str, n: int = 1) -> None:
+        counters = self.data.setdefault("counters", {})
+        counters[category] = counters.get(category, 0) + n
+
+    def log(self, level: str, msg: str, category: str|None = None) -> None:
+        if category:
+            self.count(category)
+        if LOG_LEVEL_ORDER.get(level, 0) < self.threshold:
+            return
+        data = self.data
+        sequence = data.get("log_total", 0)
+        data["log_total"] = sequence + 1
+        entry = {
+            "message": msg,
+            "status": level,
+            "sequence": sequence,
+        }
+        if self.max_entries is None or sequence < self.head_size or \
+                LOG_LEVEL_ORDER.get(level, 0) >= LOG_LEVEL_ORDER[LogLevelChoices.LOG_WARNING]:
+            self.kept.append(entry)
+        else:
+            self.latest.append((entry, category or ""))
+            if len(self.latest) > self.latest_size:
+                self.push_out(*self.latest.popleft())
+        self.save_progress()
+
+    def push_out(self, entry: dict, category: str) -> None:
+        """ Drop entry that no longer fits into job.data, or store it to overflow table """
+        if self.overflow:
+            self.pending.append(JobLogEntry(
+                job_id=self.job.pk,
+                sequence=entry["sequence"],
+                level=entry["status"],
+                category=category,
+                message=entry["message"],
+            ))
+            if len(self.pending) >= OVERFLOW_BATCH_SIZE:
+                self.flush()
+        else:
+            self.data["log_dropped"] = self.data.get("log_dropped", 0) + 1
+
+    def store(self) -> None:
+        """ Put kept and latest log entries into job.data, in sequence order """
+        latest = (entry for entry, category in self.latest)
+        self.data["log"] = list(heapq.merge(self.kept, latest, key=lambda entry: entry["sequence"]))
+
+    def add_output(self, row: dict) -> None:
+        data = self.data
+        output = data.setdefault("output", [])
+        data["output_total"] = data.get("output_total", 0) + 1
+        if self.max_entries is None or len(output) < self.max_entries:
+            output.append(row)
+        self.save_progress()
+
+    def flush(self) -> None:
+        """
+        Store log entries to job.data and write pending overflow entries to
+        database. Call before job (and its data) is saved.
+        """
+        self.store()
+        if not self.pending:
+            return
+        JobLogEntry.objects.bulk_create(self.pending)
+        self.pending = []
+
+    def save_progress(self, force: bool = False) -> None:
+        """ Save job.data to database, at most once every SAVE_INTERVAL seconds """
+        if not self.job.pk:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_save < SAVE_INTERVAL:
+            return
+        self.last_save = now
+        self.flush()
+        # only data field, job status is managed by Job methods
+        Job.objects.filter(pk=self.job.pk).update(data=self.job.data)
+
+
+def tail_log(job: Job, offset: int, limit: int = TAIL_LIMIT) -> tuple[list[tuple[int, dict]], int]:
+    """
+    Return up to limit (sequence, entry) log entries of job with sequence of
+    at least offset, from job.data and from JobLogEntry overflow table, and
+    offset to continue from. Sequence numbers of dropped entries are skipped.
+    """
+    data = job.data or {}
+    logs = data.get("log", [])
+    entries = [
+        (entry.get("sequence", i), entry) for i, entry in enumerate(logs)
+        if entry.get("sequence", i) >= offset
+    ][:limit]
+    if data.get("log_total", 0) > len(logs) + data.get("log_dropped", 0):
+        # some entries were stored to overflow table
+        overflow = JobLogEntry.objects.filter(
+            job=job,
+            sequence__gte=offset,
+        ).order_by("sequence")[:limit]
+        entries.extend(
+            (entry.sequence, {"message": entry.message, "status": entry.level})
+            for entry in overflow
+        )
+        entries = sorted(entries, key=lambda e: e[0])[:limit]
+    if entries:
+        offset = entries[-1][0] + 1
+    return entries, offset
+
+
+def tail_output(job: Job, offset: int, limit: int = TAIL_LIMIT) -> tuple[list[dict], int]:
+    """ Return up to limit output rows of job starting at offset and offset to continue from """
+    rows = (job.data or {}).get("output", [])[offset:offset + limit]
+    return rows, offset + len(rows)
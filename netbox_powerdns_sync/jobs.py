@@ -1,63 +1,132 @@
 import logging
+import netaddr
 import powerdns
 import traceback
-from datetime import timedelta
-from django.db.models import Q
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Max, Min, Q, QuerySet
+from django.utils import timezone
+from powerdns.exceptions import PDNSError
+from requests import RequestException
 
 from core.choices import JobStatusChoices
 from core.models import Job
 from dcim.models import Device, Interface
 from extras.choices import LogLevelChoices
+from extras.models import ObjectChange
 from ipam.models import IPAddress, FHRPGroup
-from netbox_powerdns_sync.constants import FAMILY_TYPES, PTR_TYPE
+from netbox_powerdns_sync.constants import FAMILY_TYPES, PTR_TYPE, WRITE_POLICY_QUORUM
 from virtualization.models import VirtualMachine, VMInterface
 
+from .changeset import ChangeSet, group_rrsets
+from .choices import SyncStatusChoices
+from .client import get_rrsets
+from .config import SyncConfig
 from .exceptions import *
-from .models import ApiServer, Zone
+from .joblog import JobLogSink
+from .models import ApiServer, OutboxEntry, SyncAction, Zone
 from .naming import generate_fqdn
+from .prefetch import iter_prefetched_addresses
+from .profiling import PhaseStats
 from .record import DnsRecord
-from .utils import get_ip_ttl, make_dns_label, make_canonical
+from .reverse_index import ptr_name, reverse_zone_network
+from .utils import get_ip_ttl, label_cache_stats, make_dns_label, make_dns_name
 
 
 logger = logging.getLogger("netbox.netbox_powerdns_sync.jobs")
 
+# number of SyncAction rows written with one query
+SYNC_ACTION_BATCH_SIZE = 1000
+
+# outbox entries claimed by a drainer are not claimed again for this long,
+# so entries of a drainer that died are picked up later
+OUTBOX_CLAIM_TIMEOUT = timedelta(minutes=15)
+# entries whose changes failed are retried after 2^attempts minutes (at most
+# OUTBOX_MAX_BACKOFF) and dropped after OUTBOX_MAX_ATTEMPTS attempts
+OUTBOX_MAX_BACKOFF = timedelta(hours=1)
+OUTBOX_MAX_ATTEMPTS = 10
+
+# incremental syncs also re-check changes logged this long before start of
+# previous sync, change log entries of transactions that were still open
+# then have a lower pk than the watermark, but were not visible yet
+WATERMARK_OVERLAP = timedelta(minutes=10)
+
+
+def next_scheduled_time(job: Job) -> datetime:
+    """
+    Next run of a periodic job, one interval after the time this run was
+    scheduled for (or started at, if it was enqueued without schedule), so
+    runs don't drift by their duration. Runs missed while no worker was
+    running are skipped instead of run back to back.
+    """
+    interval = timedelta(minutes=job.interval)
+    scheduled = (job.scheduled or job.started) + interval
+    now = timezone.now()
+    if scheduled <= now:
+        scheduled += interval * ((now - scheduled) // interval + 1)
+    return scheduled
+
 
 class JobLoggingMixin:
-    def log(self, level: str, msg: str) -> None:
-        data = self.job.data or {}
-        logs = data.get("log", [])
-        logs.append({
-            "message": msg,
-            "status": level,
-        })
-        data["log"] = logs
-        self.job.data = data
+    """ Logs to module logger and to job's JobLogSink (self.log_sink) """
+    def log(self, level: str, msg: str, category: str|None = None) -> None:
+        self.log_sink.log(level, msg, category=category)
     
-    def log_debug(self, msg: str) -> None:
+    def log_debug(self, msg: str, category: str|None = None) -> None:
         logger.debug(msg)
-        self.log(LogLevelChoices.LOG_DEFAULT, msg)
+        self.log(LogLevelChoices.LOG_DEFAULT, msg, category)
 
-    def log_success(self, msg: str) -> None:
+    def log_success(self, msg: str, category: str|None = None) -> None:
         logger.info(msg)
-        self.log(LogLevelChoices.LOG_SUCCESS, msg)
+        self.log(LogLevelChoices.LOG_SUCCESS, msg, category)
 
-    def log_info(self, msg: str) -> None:
+    def log_info(self, msg: str, category: str|None = None) -> None:
         logger.info(msg)
-        self.log(LogLevelChoices.LOG_INFO, msg)
+        self.log(LogLevelChoices.LOG_INFO, msg, category)
 
-    def log_warning(self, msg: str) -> None:
+    def log_warning(self, msg: str, category: str|None = None) -> None:
         logger.warning(msg)
-        self.log(LogLevelChoices.LOG_WARNING, msg)
+        self.log(LogLevelChoices.LOG_WARNING, msg, category)
 
-    def log_failure(self, msg: str) -> None:
+    def log_failure(self, msg: str, category: str|None = None) -> None:
         logger.error(msg)
-        self.log(LogLevelChoices.LOG_FAILURE, msg)
+        self.log(LogLevelChoices.LOG_FAILURE, msg, category)
+
+    def terminate(self, status: str = JobStatusChoices.STATUS_COMPLETED) -> None:
+        """ Store remaining overflow log entries and mark job as finished """
+        self.log_sink.flush()
+        self.job.terminate(status=status)
 
 
 class PowerdnsTask(JobLoggingMixin):
     def __init__(self, job: Job) -> None:
         self.job = job
+        # settings are read once, changes apply from the next job on
+        self.config = SyncConfig.load()
+        self.log_sink = JobLogSink(
+            job,
+            level=self.config.job_log_level,
+            max_entries=self.config.job_log_max_entries,
+            overflow=self.config.job_log_overflow,
+        )
         self.init_attrs()
+        # zones may have been changed by another process since index was built
+        Zone.get_index(revalidate=True)
+        # run scoped caches: zone name -> enabled servers, server -> PDNSServer
+        # and (server, zone name) -> PDNSZone
+        self.zone_servers : dict[str, list[ApiServer]] = {}
+        self.pdns_servers : dict[int, powerdns.interface.PDNSServer] = {}
+        self.pdns_zones : dict[tuple[int, str], powerdns.interface.PDNSZone] = {}
+        # zone name -> servers that could not be read, count as failed writes
+        self.unread_servers : dict[str, list[ApiServer]] = {}
+        # label caches are shared by all tasks of a worker, remember counters
+        # at start so only this task's hits & misses are reported
+        self.label_cache_start = label_cache_stats()
+        # with plan set, changes are only recorded and not sent to servers
+        self.plan = False
+        self.phase_stats = PhaseStats()
     
     def init_attrs(self):
         self.fqdn : str = ""
@@ -68,20 +137,56 @@ class PowerdnsTask(JobLoggingMixin):
     def get_pdns_servers_for_zone(self, zone_name:str) -> list[ApiServer]:
         if not zone_name:
             return []
-        zone = Zone.objects.get(name=zone_name)
-        return zone.api_servers.enabled().all()
+        if zone_name not in self.zone_servers:
+            self.zone_servers[zone_name] = list(ApiServer.objects.enabled().filter(zones__name=zone_name))
+        return self.zone_servers[zone_name]
+
+    def get_pdns_zone(self, api_server: ApiServer, zone_name: str) -> powerdns.interface.PDNSZone:
+        """ Get zone from PowerDNS server, only once per task """
+        key = (api_server.pk, zone_name)
+        if key not in self.pdns_zones:
+            if api_server.pk not in self.pdns_servers:
+                self.pdns_servers[api_server.pk] = api_server.api
+            # PDNSServer lists zones once and caches the list
+            pdns_zone = self.pdns_servers[api_server.pk].get_zone(zone_name)
+            if not pdns_zone:
+                raise PowerdnsSyncServerZoneMissing(
+                    f"Zone {zone_name} not found on server {api_server}"
+                )
+            self.pdns_zones[key] = pdns_zone
+        return self.pdns_zones[key]
 
     def add_to_output(self, row):
-        if not self.job.data:
-            self.job.data = dict()
-        if "output" not in self.job.data:
-            self.job.data["output"] = []
-        self.job.data["output"].append(row)
+        self.log_sink.add_output(row)
+
+    def save_label_cache_stats(self) -> None:
+        """ Store hit & miss counts of DNS label caches for this task to job data """
+        stats = {}
+        for key, counters in label_cache_stats().items():
+            hits = counters["hits"] - self.label_cache_start[key]["hits"]
+            misses = counters["misses"] - self.label_cache_start[key]["misses"]
+            total = hits + misses
+            stats[key] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / total, 3) if total else None,
+            }
+        self.job.data = self.job.data or dict()
+        self.job.data["label_cache"] = stats
+
+    def save_phase_stats(self) -> None:
+        """ Store wall time, SQL query & API request counts of job phases to job data """
+        self.job.data = self.job.data or dict()
+        self.job.data["phases"] = self.phase_stats.phases
+
+    def save_actions(self, actions: list[SyncAction]) -> None:
+        """ Store all changes sent to servers, job.data only keeps a sample """
+        if actions and self.job.pk:
+            SyncAction.objects.bulk_create(actions, batch_size=SYNC_ACTION_BATCH_SIZE)
 
     def make_name_from_interface(self, interface: Interface|VMInterface, host: Device|VirtualMachine) -> str:
-        name = host.name
-        name = ".".join(map(make_dns_label, name.split(".")))
-        if self.ip != host.primary_ip4 and self.ip != host.primary_ip6:
+        name = make_dns_name(host.name)
+        if self.ip.pk not in (host.primary_ip4_id, host.primary_ip6_id):
             name = make_dns_label(interface.name) + "." + name
         return name
 
@@ -109,38 +214,190 @@ class PowerdnsTask(JobLoggingMixin):
             self.forward_zone = Zone.get_best_zone(name)
         # determine zone by matching tags or roles
         if not self.forward_zone:
-            self.forward_zone = Zone.match_ip(self.ip).first()
+            zones = Zone.match_ip(self.ip)
+            self.forward_zone = zones[0] if zones else None
         return self.forward_zone
 
-    def make_reverse_domain(self) -> str|None:
-        """ Returns reverse domain name """
-        return make_canonical(self.ip.address.ip.reverse_dns)
+    def determine_reverse_zone(self) -> int|None:
+        """
+        Set reverse zone for IP from the integer range index of reverse zones.
+        Returns prefix length of zone, used to build PTR name with make_ptr_name().
+        """
+        address = self.ip.address.ip
+        entry = Zone.get_index().reverse.lookup(address.version, int(address))
+        if entry is None:
+            self.reverse_zone = None
+            return None
+        prefixlen, self.reverse_zone = entry
+        return prefixlen
+
+    def make_ptr_name(self, prefixlen: int) -> str:
+        """ PTR owner name for IP, relative to its reverse zone """
+        address = self.ip.address.ip
+        return ptr_name(address.version, int(address), prefixlen)
 
     def create_record(self, dns_record: DnsRecord) -> None:
-        servers = self.get_pdns_servers_for_zone(dns_record.zone_name)
-        if not servers:
-            raise PowerdnsSyncNoServers(f"No valid servers found for zone {dns_record.zone_name}")
-        for api_server in self.get_pdns_servers_for_zone(dns_record.zone_name):
-            zone = api_server.api.get_zone(dns_record.zone_name)
-            if not zone:
-                raise PowerdnsSyncServerZoneMissing(
-                    f"Zone {dns_record.zone_name} not found on server {api_server}"
-                )
-            self.add_to_output({"action": "CREATE", "rr": str(dns_record), "zone": str(zone), "server": str(api_server)})
-            zone.create_records([dns_record.as_rrset()])
+        change_set = ChangeSet(dns_record.zone_name, self.config)
+        change_set.replace([dns_record])
+        self.apply_change_set(change_set)
 
     def delete_record(self, dns_record: DnsRecord) -> None:
-        servers = self.get_pdns_servers_for_zone(dns_record.zone_name)
+        change_set = ChangeSet(dns_record.zone_name, self.config)
+        change_set.delete(dns_record)
+        self.apply_change_set(change_set)
+
+    def run_parallel(self, func, items: list) -> list[tuple[object, Exception|None]]:
+        """
+        Call func for each item in a bounded thread pool. Returns (result, exception)
+        for every item, in the same order as items. func must not use database
+        or job logging, since it runs outside of the job's thread.
+        """
+        if len(items) < 2:
+            workers = 1
+        else:
+            workers = min(len(items), self.config.api_max_workers)
+        def call(item):
+            try:
+                return func(item), None
+            except Exception as e:
+                return None, e
+        if workers == 1:
+            return [call(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="powerdns-sync") as executor:
+            return list(executor.map(call, items))
+
+    def make_action(self, rrset: powerdns.RRSet, zone_name: str, api_server: ApiServer, status: str) -> SyncAction:
+        """ SyncAction for rrset sent (or planned to be sent) to server, also added to job output """
+        action = SyncAction(
+            job_id=self.job.pk,
+            action=rrset["changetype"],
+            rrset=ChangeSet.describe(rrset),
+            zone=zone_name,
+            server=str(api_server),
+            status=status,
+        )
+        self.add_to_output({
+            "action": action.action,
+            "rr": action.rrset,
+            "zone": action.zone,
+            "server": action.server,
+            "status": action.status,
+        })
+        return action
+
+    def push_server_change_sets(self, zone_name: str, change_sets: dict[ApiServer, ChangeSet]) -> None:
+        """ Send changes to servers, or only record them when task is planning """
+        if self.plan:
+            with self.phase_stats.phase("plan"):
+                self.plan_server_change_sets(zone_name, change_sets)
+        else:
+            with self.phase_stats.phase("write"):
+                self.apply_server_change_sets(zone_name, change_sets)
+
+    def plan_server_change_sets(self, zone_name: str, change_sets: dict[ApiServer, ChangeSet]) -> None:
+        """
+        Record changes that would be sent to each server as planned actions
+        and store rrset counts per zone & server to job data. Nothing is sent.
+        """
+        actions = []
+        plan = {}
+        for api_server, change_set in change_sets.items():
+            plan[str(api_server)] = {
+                "to_replace": change_set.replace_count,
+                "to_delete": change_set.delete_count,
+            }
+            for rrset in change_set:
+                actions.append(self.make_action(rrset, zone_name, api_server, SyncStatusChoices.STATUS_PLANNED))
+        self.save_actions(actions)
+        self.job.data = self.job.data or dict()
+        self.job.data.setdefault("plan", {})[zone_name] = plan
+
+    def apply_change_set(self, change_set: ChangeSet) -> None:
+        """ Send the same changes to all servers of zone """
+        if not change_set:
+            return
+        zone_name = change_set.zone_name
+        servers = self.get_pdns_servers_for_zone(zone_name)
         if not servers:
-            raise PowerdnsSyncNoServers(f"No valid servers found for zone {dns_record.zone_name}")
-        for api_server in self.get_pdns_servers_for_zone(dns_record.zone_name):
-            zone = api_server.api.get_zone(dns_record.zone_name)
-            if not zone:
-                raise PowerdnsSyncServerZoneMissing(
-                    f"Zone {dns_record.zone_name} not found on server {api_server}"
-                )
-            self.add_to_output({"action": "DELETE", "rr": str(dns_record), "zone": str(zone), "server": str(api_server)})
-            zone.delete_records([dns_record.as_rrset()])
+            raise PowerdnsSyncNoServers(f"No valid servers found for zone {zone_name}")
+        self.apply_server_change_sets(zone_name, {api_server: change_set for api_server in servers})
+
+    def required_servers(self, total: int) -> int:
+        """ Number of servers that must succeed, depending on write_policy setting """
+        if self.config.write_policy == WRITE_POLICY_QUORUM:
+            return total // 2 + 1
+        return total
+
+    def apply_server_change_sets(self, zone_name: str, change_sets: dict[ApiServer, ChangeSet]) -> None:
+        """
+        Send each server its own changes, all servers in parallel, one PATCH
+        request per chunk of rrsets. A failed chunk is reported and remaining
+        chunks are still sent. Depending on write_policy setting all servers
+        or a majority of them must accept all chunks. Servers without changes
+        count as successful, servers whose records could not be read (see
+        load_pdns_records()) as failed.
+        """
+        quorum = self.config.write_policy == WRITE_POLICY_QUORUM
+        failed_servers = list(self.unread_servers.get(zone_name, ()))
+        total = len(change_sets) + len(failed_servers)
+        required = self.required_servers(total)
+        chunk_size = self.config.patch_chunk_size
+
+        targets = []
+        for api_server, change_set in change_sets.items():
+            if not change_set:
+                continue
+            try:
+                pdns_zone = self.get_pdns_zone(api_server, zone_name)
+            except (PowerdnsSyncServerZoneMissing, PDNSError, RequestException) as e:
+                if not quorum:
+                    raise
+                self.log_failure(f"Unable to get zone {zone_name} from server {api_server}: {e}")
+                failed_servers.append(api_server)
+                continue
+            targets.append((api_server, pdns_zone, change_set, change_set.chunks(chunk_size)))
+
+        def send_chunks(target) -> list[Exception|None]:
+            api_server, pdns_zone, change_set, chunks = target
+            errors = []
+            for chunk in chunks:
+                try:
+                    change_set.send(pdns_zone, chunk)
+                    errors.append(None)
+                except (PDNSError, RequestException) as e:
+                    errors.append(e)
+            return errors
+
+        results = self.run_parallel(send_chunks, targets)
+        actions = []
+        for (api_server, pdns_zone, change_set, chunks), (errors, exception) in zip(targets, results):
+            if exception:
+                # unexpected error, all chunks for this server are considered failed
+                errors = [exception] * len(chunks)
+            for i, (chunk, error) in enumerate(zip(chunks, errors), start=1):
+                if error:
+                    self.log_failure(
+                        f"Change chunk {i}/{len(chunks)} ({len(chunk)} rrsets) for zone {pdns_zone} "
+                        f"failed on server {api_server}: {error}"
+                    )
+                status = SyncStatusChoices.STATUS_FAILED if error else SyncStatusChoices.STATUS_OK
+                for rrset in chunk:
+                    actions.append(self.make_action(rrset, str(pdns_zone), api_server, status))
+            if any(errors):
+                failed_servers.append(api_server)
+        self.save_actions(actions)
+
+        succeeded = total - len(failed_servers)
+        if succeeded < required:
+            raise PowerdnsSyncServerError(
+                f"Changes for zone {zone_name} applied on {succeeded} of {total} servers, "
+                f"{required} required"
+            )
+        if failed_servers:
+            self.log_warning(
+                f"Changes for zone {zone_name} failed on servers "
+                f"{', '.join(map(str, failed_servers))}, quorum of {required} reached"
+            )
 
 
 class PowerdnsTaskIP(PowerdnsTask):
@@ -149,110 +406,319 @@ class PowerdnsTaskIP(PowerdnsTask):
         self.ip : IPAddress = job.object
 
     @classmethod
-    def run_update_ip(cls, job: Job, *args, **kwargs) -> None:
+    def run_update_ip(cls, job: Job, *args, ip_pks: list[int]|None = None, **kwargs) -> None:
+        """
+        Update records of job's IP address, or of all addresses in ip_pks
+        (set when updates of several addresses were coalesced into one job)
+        """
         task = cls(job)
-        if job.object_id and not job.object:
+        if not ip_pks and job.object_id and not job.object:
             task.job.start()
             task.log_warning("No IP Address object given. IP was probably removed or DB transaction aborted, nothing to do.")
-            task.job.terminate(status=JobStatusChoices.STATUS_COMPLETED)
+            task.terminate(status=JobStatusChoices.STATUS_COMPLETED)
             return
         try:
             task.log_debug("Starting task")
             task.job.start()
-            task.log_debug("Creating forward record")
-            task.create_forward()
-            task.log_debug("Creating reverse record")
-            task.create_reverse()
+            if ip_pks:
+                invalid, unapplied = task.update_ips(ip_pks)
+                if invalid or unapplied:
+                    task.terminate(status=JobStatusChoices.STATUS_ERRORED)
+                    return
+            else:
+                task.log_debug("Creating forward record")
+                task.create_forward()
+                task.log_debug("Creating reverse record")
+                task.create_reverse()
+            task.save_label_cache_stats()
             task.log_success("Finished")
-            task.job.terminate()
+            task.terminate()
         except Exception as e:
             task.log_failure(f"error {e}")
             task.job.data = task.job.data or dict()
             task.job.data["exception"] = str(e)
-            task.job.terminate(status=JobStatusChoices.STATUS_ERRORED)
+            task.terminate(status=JobStatusChoices.STATUS_ERRORED)
             raise e
 
-    def create_forward(self) -> None:
+    def update_ips(self, ip_pks: list[int]) -> tuple[set[int], set[int]]:
+        """
+        Update records of many IP addresses. Addresses are loaded in chunks
+        with related objects prefetched, records are collected per zone and
+        sent with one PATCH request (per chunk of rrsets) for each zone.
+        Addresses and zones that fail are reported, others are still updated.
+        Returns pks of addresses that could not be named (invalid) and of
+        addresses with records in zones whose changes were not applied.
+        """
+        records : dict[str, list[DnsRecord]] = {}
+        zone_ips : dict[str, set[int]] = {}
+        invalid = set()
+        found = 0
+        for ip in iter_prefetched_addresses(ip_pks):
+            found += 1
+            self.init_attrs()
+            self.ip = ip
+            try:
+                forward_record = self.make_forward_record()
+                reverse_record = self.make_reverse_record()
+            except (PowerdnsSyncNoZoneFound, PowerdnsSyncNoNameFound, PowerdnsSyncNamingError, ValueError) as e:
+                self.log_failure(f"Unable to update IP:{ip}: {e}", "failed")
+                invalid.add(ip.pk)
+                continue
+            for record in (forward_record, reverse_record):
+                if record:
+                    records.setdefault(record.zone_name, []).append(record)
+                    zone_ips.setdefault(record.zone_name, set()).add(ip.pk)
+        if found < len(ip_pks):
+            self.log_warning(
+                f"{len(ip_pks) - found} of {len(ip_pks)} IP addresses not found, "
+                "they were probably removed in the meantime"
+            )
+        unapplied = set()
+        for zone_name, zone_records in records.items():
+            change_set = ChangeSet(zone_name, self.config)
+            for rrset_records in group_rrsets(zone_records).values():
+                change_set.replace(rrset_records)
+            self.log_info(f"Zone {zone_name}: updating {len(change_set)} rrsets")
+            try:
+                self.apply_change_set(change_set)
+            except (PowerdnsSyncNoServers, PowerdnsSyncServerError, PowerdnsSyncServerZoneMissing, PDNSError, RequestException) as e:
+                self.log_failure(f"Unable to update zone {zone_name}: {e}", "failed_zone")
+                unapplied.update(zone_ips[zone_name])
+        if invalid:
+            self.log_failure(f"Unable to update {len(invalid)} of {found} IP addresses")
+        return invalid, unapplied
+
+    def make_forward_record(self) -> DnsRecord:
         self.make_fqdn()
         if not self.forward_zone:
             raise PowerdnsSyncNoZoneFound(f"No forward zone found for IP:{self.ip}")
         if not self.fqdn:
             raise PowerdnsSyncNoNameFound(f"No forward name for IP:{self.ip} (zone:{self.forward_zone})")
         name = self.fqdn.replace(self.forward_zone.name, "").rstrip(".")
-        dns_record = DnsRecord(
+        return DnsRecord(
             name=name,
             dns_type=FAMILY_TYPES[self.ip.family],
             data=str(self.ip.address.ip),
-            ttl=get_ip_ttl(self.ip) or self.forward_zone.default_ttl,
+            ttl=get_ip_ttl(self.ip, self.config) or self.forward_zone.default_ttl,
             zone_name=self.forward_zone.name,
         )
-        self.log_info(f"Forward record: {dns_record}")
-        self.create_record(dns_record)
-        self.log_info(f"Forward record created")
 
-    def create_reverse(self) -> None:
+    def make_reverse_record(self) -> DnsRecord|None:
         self.make_fqdn()
         if not self.fqdn:
             raise PowerdnsSyncNoNameFound(f"No forward name for IP:{self.ip}")
-        reverse_fqdn = self.make_reverse_domain()
-        self.reverse_zone = Zone.get_best_zone(reverse_fqdn)
+        prefixlen = self.determine_reverse_zone()
         if not self.reverse_zone:
             self.log_warning(f"No reverse zone for IP:{self.ip} fqdn:{self.fqdn} Skipping")
-            return
-        name = reverse_fqdn.replace(self.reverse_zone.name, "").rstrip(".")
-        dns_record = DnsRecord(
-            name=name,
+            return None
+        return DnsRecord(
+            name=self.make_ptr_name(prefixlen),
             dns_type=PTR_TYPE,
             data=self.fqdn,
-            ttl=get_ip_ttl(self.ip) or self.reverse_zone.default_ttl,
+            ttl=get_ip_ttl(self.ip, self.config) or self.reverse_zone.default_ttl,
             zone_name=self.reverse_zone.name,
         )
+
+    def create_forward(self) -> None:
+        dns_record = self.make_forward_record()
+        self.log_info(f"Forward record: {dns_record}")
+        self.create_record(dns_record)
+        self.log_info(f"Forward record created")
+
+    def create_reverse(self) -> None:
+        dns_record = self.make_reverse_record()
+        if not dns_record:
+            return
         self.log_info(f"Reverse record {dns_record}")
         self.create_record(dns_record)
         self.log_info(f"Reverse record created")
 
 
+class PowerdnsTaskOutbox(PowerdnsTaskIP):
+    """
+    Drains outbox: claims entries in chunks of outbox_batch_size, merges
+    entries for the same IP and updates each IP once. Claiming is committed
+    before any request is sent, so no transaction or row lock is held during
+    updates and concurrent drainers skip claimed entries. Entries are removed
+    once their changes were applied. Entries with records in a zone that
+    failed are retried later with backoff, so one failing zone does not
+    hold back updates of other zones.
+    """
+    @classmethod
+    def run_drain_outbox(cls, job: Job, *args, **kwargs) -> None:
+        task = cls(job)
+        try:
+            task.log_debug("Starting outbox drain")
+            task.job.start()
+            task.drain()
+            task.log_success("Finished")
+            task.terminate()
+        except Exception as e:
+            stacktrace = traceback.format_exc()
+            task.log_failure(f"An exception occurred: `{type(e).__name__}: {e}`\n```\n{stacktrace}\n```")
+            task.terminate(status=JobStatusChoices.STATUS_ERRORED)
+
+        # Entries committed while this job was running did not start another
+        # drainer (see coalesce.start_outbox_drainer()), so look for entries
+        # left in outbox once job has finished
+        next_run = task.next_run(job.interval, failed=job.status == JobStatusChoices.STATUS_ERRORED)
+        if next_run is not None:
+            Job.enqueue(
+                cls.run_drain_outbox,
+                instance=OutboxEntry(),
+                name=job.name,
+                user=job.user,
+                schedule_at=next_run if next_run > timezone.now() else None,
+                interval=job.interval,
+            )
+
+    def next_run(self, interval: int|None, failed: bool = False) -> datetime|None:
+        """
+        When next drainer should run: right away if there are entries waiting
+        (or once the first retry is due), but not sooner than interval
+        minutes (at least a minute after a failed run). None if outbox is
+        empty, a new drainer is then started when entries are added.
+        """
+        now = timezone.now()
+        if OutboxEntry.objects.filter(next_attempt__isnull=True).exists():
+            due = now
+        else:
+            due = OutboxEntry.objects.aggregate(Min("next_attempt"))["next_attempt__min"]
+            if due is None:
+                return None
+        if failed:
+            interval = interval or 1
+        if interval:
+            due = max(due, now + timedelta(minutes=interval))
+        return due
+
+    def drain(self) -> None:
+        while True:
+            entries = self.claim_entries()
+            if not entries:
+                break
+            ip_pks = list(dict.fromkeys(entry.ip_id for entry in entries))
+            self.log_info(f"Processing {len(entries)} outbox entries for {len(ip_pks)} IP addresses")
+            # addresses that can't be updated (no zone or name) are reported
+            # and dropped, addresses in zones that failed are retried
+            invalid, unapplied = self.update_ips(ip_pks)
+            self.release_entries(entries, unapplied)
+
+    def claim_entries(self) -> list[OutboxEntry]:
+        """ Claim a chunk of entries that are due, in a short transaction of its own """
+        now = timezone.now()
+        with transaction.atomic():
+            entries = list(
+                OutboxEntry.objects.select_for_update(skip_locked=True)
+                .filter(Q(next_attempt__isnull=True)|Q(next_attempt__lte=now))
+                .order_by("pk")[:self.config.outbox_batch_size]
+            )
+            if entries:
+                OutboxEntry.objects.filter(pk__in=[entry.pk for entry in entries]).update(
+                    next_attempt=now + OUTBOX_CLAIM_TIMEOUT,
+                )
+        return entries
+
+    def release_entries(self, entries: list[OutboxEntry], unapplied: set[int]) -> None:
+        """ Delete entries that were applied, schedule a retry of the others """
+        done = [entry.pk for entry in entries if entry.ip_id not in unapplied]
+        OutboxEntry.objects.filter(pk__in=done).delete()
+        retry = [entry for entry in entries if entry.ip_id in unapplied]
+        if not retry:
+            return
+        dropped = {entry.pk for entry in retry if entry.attempts + 1 >= OUTBOX_MAX_ATTEMPTS}
+        if dropped:
+            self.log_failure(
+                f"Dropping {len(dropped)} outbox entries after {OUTBOX_MAX_ATTEMPTS} failed attempts, "
+                "their records are corrected by next full sync of zone"
+            )
+            OutboxEntry.objects.filter(pk__in=dropped).delete()
+        retry = [entry for entry in retry if entry.pk not in dropped]
+        now = timezone.now()
+        for entry in retry:
+            entry.attempts += 1
+            entry.next_attempt = now + min(timedelta(minutes=2 ** entry.attempts), OUTBOX_MAX_BACKOFF)
+        if retry:
+            OutboxEntry.objects.bulk_update(retry, ["attempts", "next_attempt"])
+            self.log_warning(f"{len(retry)} outbox entries will be retried")
+
+
 class PowerdnsTaskFullSync(PowerdnsTask):
     def __init__(self, job: Job) -> None:
         super().__init__(job)
         self.zone : Zone = job.object
 
     @classmethod
-    def run_full_sync(cls, job: Job, *args, **kwargs) -> None:
+    def run_full_sync(cls, job: Job, *args, full: bool = False, plan: bool = False, **kwargs) -> None:
+        """
+        Sync records of zone. Unless full is set, only addresses changed since
+        last sync are checked if full_sync_interval setting allows it (see
+        use_incremental()). With plan set, changes are computed and stored
+        with the job, but not sent to servers.
+        """
         task = cls(job)
+        task.plan = plan
 
         try:
             task.log_debug(f"Starting sync for zone {task.zone}")
             task.job.start()
             if not task.zone.enabled:
                 task.log_warning(f"Zone {task.zone} is disabled for updates, not syncing")
-                task.job.terminate()
+                task.terminate()
                 return
-            netbox_records = task.load_netbox_records()
-            pdns_records = task.load_pdns_records()
-            task.log_info(f"Found record count: netbox:{len(netbox_records)} pdns:{len(pdns_records)}")
-            to_delete = pdns_records - netbox_records
-            to_create = netbox_records - pdns_records
-            task.log_info(f"Record change count: to_delete:{len(to_delete)} to_create:{len(to_create)}")
-            for record in to_delete:
-                task.delete_record(record)
-            for record in to_create:
-                task.create_record(record)
+            # taken before anything is read, changes made during sync are
+            # included again in next incremental sync
+            watermark, started = task.take_watermark()
+            changed = None
+            if not full and task.use_incremental():
+                with task.phase_stats.phase("changed_addresses"):
+                    changed = task.get_changed_addresses()
+            with task.phase_stats.phase("load_netbox_records"):
+                if changed is None:
+                    task.log_info("Full sync" if not plan else "Plan of full sync")
+                    netbox_records = task.load_netbox_records()
+                else:
+                    ip_pks, addresses = changed
+                    task.log_info(
+                        f"{'Plan of incremental' if plan else 'Incremental'} sync of changes "
+                        f"{task.zone.sync_watermark + 1}-{watermark}: {len(ip_pks)} changed addresses"
+                    )
+                    netbox_records = task.load_netbox_records(ip_pks)
+            task.log_info(f"Found record count: netbox:{len(netbox_records)}")
+            with task.phase_stats.phase("load_pdns_records"):
+                server_records = task.load_pdns_records()
+            change_sets = {}
+            with task.phase_stats.phase("diff"):
+                for api_server, pdns_records in server_records.items():
+                    desired = netbox_records
+                    if changed is not None:
+                        desired, pdns_records = task.limit_to_addresses(netbox_records, pdns_records, addresses)
+                    change_set = ChangeSet.from_records(task.zone.name, desired, pdns_records, task.config)
+                    change_sets[api_server] = change_set
+                    task.log_info(
+                        f"Server {api_server}: pdns records:{len(pdns_records)} "
+                        f"rrsets to_replace:{change_set.replace_count} to_delete:{change_set.delete_count}"
+                    )
+            task.push_server_change_sets(task.zone.name, change_sets)
+            if not plan:
+                task.save_watermark(watermark, started, full=changed is None)
+            task.save_label_cache_stats()
+            task.save_phase_stats()
             task.log_success("Finished")
-            task.job.terminate()
+            task.terminate()
         except PowerdnsSyncNoServers as e:
             task.log_failure(str(e))
-            task.job.data = task.job.data or dict()
-            task.job.terminate(status=JobStatusChoices.STATUS_ERRORED)
+            task.save_phase_stats()
+            task.terminate(status=JobStatusChoices.STATUS_ERRORED)
         except Exception as e:
             stacktrace = traceback.format_exc()
             task.log_failure(f"An exception occurred: `{type(e).__name__}: {e}`\n```\n{stacktrace}\n```")
-            task.job.data = task.job.data or dict()
-            task.job.terminate(status=JobStatusChoices.STATUS_ERRORED)
+            task.save_phase_stats()
+            task.terminate(status=JobStatusChoices.STATUS_ERRORED)
 
         # Schedule the next job if an interval has been set
         if job.interval:
-            new_scheduled_time = job.scheduled + timedelta(minutes=job.interval)
+            new_scheduled_time = next_scheduled_time(job)
             Job.enqueue(
                 cls.run_full_sync,
                 instance=job.object,
@@ -260,45 +726,239 @@ class PowerdnsTaskFullSync(PowerdnsTask):
                 user=job.user,
                 schedule_at=new_scheduled_time,
                 interval=job.interval,
+                plan=plan,
+            )
+
+    def use_incremental(self) -> bool:
+        """
+        Incremental sync is possible once zone was fully synced, and only
+        until full_sync_interval (minutes) passes since last full sync
+        """
+        interval = self.config.full_sync_interval
+        if not interval or self.zone.sync_watermark is None or not self.zone.sync_started or not self.zone.last_full_sync:
+            return False
+        return timezone.now() - self.zone.last_full_sync < timedelta(minutes=interval)
+
+    def get_changed_addresses(self) -> tuple[set[int], set[str]]|None:
+        """
+        Find IP addresses affected by changes (ObjectChange) logged after
+        zone's watermark, or up to WATERMARK_OVERLAP before previous sync
+        started (in case they were committed after watermark was taken):
+        changed addresses and addresses assigned to changed
+        interfaces, FHRP groups, devices and VMs. Returns their primary keys
+        and IP addresses (current and previous, so records of deleted or
+        renumbered addresses are found too). Returns None when a full sync is
+        needed: zones were changed, or change log was pruned past watermark.
+        """
+        watermark = self.zone.sync_watermark
+        first_change = ObjectChange.objects.aggregate(Min("pk"))["pk__min"]
+        if first_change and first_change > watermark + 1:
+            self.log_info("Change log was pruned since last sync, full sync needed")
+            return None
+        content_types = ContentType.objects.get_for_models(
+            IPAddress, Interface, VMInterface, FHRPGroup, Device, VirtualMachine, Zone,
+        )
+        since = self.zone.sync_started - WATERMARK_OVERLAP
+        changes = ObjectChange.objects.filter(
+            Q(pk__gt=watermark)|Q(time__gte=since),
+            changed_object_type__in=content_types.values(),
+        )
+        if changes.filter(changed_object_type=content_types[Zone]).exists():
+            self.log_info("Zones were changed since last sync, full sync needed")
+            return None
+
+        models_by_type = {content_type.pk: model for model, content_type in content_types.items()}
+        changed_ids = {model: set() for model in content_types}
+        addresses = set()
+        for change in changes.only("changed_object_type_id", "changed_object_id", "prechange_data", "postchange_data").iterator():
+            model = models_by_type[change.changed_object_type_id]
+            changed_ids[model].add(change.changed_object_id)
+            if model is IPAddress:
+                for data in (change.prechange_data, change.postchange_data):
+                    if data and data.get("address"):
+                        addresses.add(str(netaddr.IPNetwork(data["address"]).ip))
+
+        def assigned_to(model, pks) -> QuerySet:
+            return IPAddress.objects.filter(
+                assigned_object_type=content_types[model],
+                assigned_object_id__in=pks,
             )
 
-    def get_addresses(self):
-        """ Get IPAddress objects that could have DNS records """
-        zone_canonical = self.zone.name
-        zone_domain = self.zone.name.rstrip(".")
+        ip_pks = set(changed_ids[IPAddress])
+        queries = [
+            assigned_to(Interface, changed_ids[Interface]),
+            assigned_to(VMInterface, changed_ids[VMInterface]),
+            assigned_to(FHRPGroup, changed_ids[FHRPGroup]),
+            assigned_to(Interface, Interface.objects.filter(device_id__in=changed_ids[Device]).values("pk")),
+            assigned_to(VMInterface, VMInterface.objects.filter(virtual_machine_id__in=changed_ids[VirtualMachine]).values("pk")),
+        ]
+        for query in queries:
+            ip_pks.update(query.values_list("pk", flat=True))
+        for address in IPAddress.objects.filter(pk__in=ip_pks).values_list("address", flat=True):
+            addresses.add(str(address.ip))
+        return ip_pks, addresses
+
+    def limit_to_addresses(self, desired: set[DnsRecord], actual: set[DnsRecord], addresses: set[str]) -> tuple[set[DnsRecord], set[DnsRecord]]:
+        """
+        Limit records of incremental sync to rrsets of changed addresses.
+        Records in PowerDNS are related to an address when they point to it
+        (A, AAAA) or are its PTR record. Other values in these rrsets belong
+        to addresses that did not change, they are kept as they are.
+        """
+        reverse_index = Zone.get_index().reverse
+        reverse_names = set()
+        for address in addresses:
+            address = netaddr.IPAddress(address)
+            ptr = reverse_index.get_ptr(address.version, int(address))
+            if ptr:
+                reverse_names.add((ptr[0].name, ptr[1]))
+
+        def related(record: DnsRecord) -> bool:
+            if record.dns_type == PTR_TYPE:
+                return (record.zone_name, record.name) in reverse_names
+            return record.data in addresses
+
+        touched = {(r.name, r.dns_type) for r in desired}
+        touched.update((r.name, r.dns_type) for r in actual if related(r))
+        actual = {r for r in actual if (r.name, r.dns_type) in touched}
+        desired = set(desired)
+        desired.update(r for r in actual if not related(r))
+        return desired, actual
+
+    def take_watermark(self) -> tuple[int, datetime]:
+        """ Last change log entry and current time, taken at start of sync """
+        started = timezone.now()
+        return ObjectChange.objects.aggregate(Max("pk"))["pk__max"] or 0, started
+
+    def save_watermark(self, watermark: int, started: datetime, full: bool, zone: Zone|None = None) -> None:
+        """ Remember last change included in sync, without touching zone's last_updated """
+        fields = {"sync_watermark": watermark, "sync_started": started}
+        if full:
+            fields["last_full_sync"] = timezone.now()
+        Zone.objects.filter(pk=(zone or self.zone).pk).update(**fields)
+
+    def get_address_queries(self, zone: Zone|None = None) -> list[QuerySet]:
+        """
+        Build queries selecting primary keys of IPAddress objects that could
+        have DNS records in zone (task's zone by default). Each query selects
+        on one criteria only (FQDN names, tags or roles) using
+        assigned_object_type & assigned_object_id, instead of joining all
+        related tables in a single query. Criteria without any tags or roles
+        set on the zone are skipped. For reverse zones addresses are selected
+        by network instead, see get_reverse_address_queries().
+        """
+        zone = zone or self.zone
+        if zone.is_reverse:
+            return self.get_reverse_address_queries(zone)
+        zone_canonical = zone.name
+        zone_domain = zone.name.rstrip(".")
+        mgmt_only = zone.match_interface_mgmt_only
+
+        def name_q(field: str) -> Q:
+            return Q(**{f"{field}__endswith": zone_canonical})|Q(**{f"{field}__endswith": zone_domain})
+
+        def assigned_to(model, objects: QuerySet) -> QuerySet|None:
+            if mgmt_only:
+                # only addresses on management interfaces can match
+                if model is not Interface:
+                    return None
+                objects = objects.filter(mgmt_only=True)
+            return IPAddress.objects.filter(
+                assigned_object_type=ContentType.objects.get_for_model(model),
+                assigned_object_id__in=objects.values("pk"),
+            )
+
+        def ips(query: Q) -> QuerySet:
+            results = IPAddress.objects.filter(query)
+            if mgmt_only:
+                results = results.filter(
+                    assigned_object_type=ContentType.objects.get_for_model(Interface),
+                    assigned_object_id__in=Interface.objects.filter(mgmt_only=True).values("pk"),
+                )
+            return results
+
+        ipaddress_tags = list(zone.match_ipaddress_tags.values_list("pk", flat=True))
+        interface_tags = list(zone.match_interface_tags.values_list("pk", flat=True))
+        device_tags = list(zone.match_device_tags.values_list("pk", flat=True))
+        fhrpgroup_tags = list(zone.match_fhrpgroup_tags.values_list("pk", flat=True))
+        device_roles = list(zone.match_device_roles.values_list("pk", flat=True))
+
         # filter for FQDN names (ip.dns_name, Device, VM, FHRPGroup)
-        query_zone = Q(dns_name__endswith=zone_canonical)|Q(dns_name__endswith=zone_domain)
-        query_zone |= Q(interface__device__name__endswith=zone_canonical)|Q(interface__device__name__endswith=zone_domain)
-        query_zone |= Q(vminterface__virtual_machine__name__endswith=zone_canonical)|Q(vminterface__virtual_machine__name__endswith=zone_domain)
-        query_zone |= Q(fhrpgroup__name__endswith=zone_canonical)|Q(fhrpgroup__name__endswith=zone_domain)
+        queries = [
+            ips(name_q("dns_name")),
+            assigned_to(Interface, Interface.objects.filter(name_q("device__name"))),
+            assigned_to(VMInterface, VMInterface.objects.filter(name_q("virtual_machine__name"))),
+            assigned_to(FHRPGroup, FHRPGroup.objects.filter(name_q("name"))),
+        ]
         # filter for matchers (tags & roles)
-        query_zone |= Q(tags__in=self.zone.match_ipaddress_tags.all())
-        query_zone |= Q(interface__tags__in=self.zone.match_interface_tags.all())
-        query_zone |= Q(vminterface__tags__in=self.zone.match_interface_tags.all())
-        query_zone |= Q(interface__device__tags__in=self.zone.match_device_tags.all())
-        query_zone |= Q(vminterface__virtual_machine__tags__in=self.zone.match_device_tags.all())
-        query_zone |= Q(fhrpgroup__tags__in=self.zone.match_fhrpgroup_tags.all())
-        query_zone |= Q(interface__device__role__in=self.zone.match_device_roles.all())
-        query_zone |= Q(vminterface__virtual_machine__role__in=self.zone.match_device_roles.all())
-        results = IPAddress.objects.filter(query_zone)
-        if self.zone.match_interface_mgmt_only:
-            results = results.filter(interface__mgmt_only=True)
-        return results
-
-    def load_netbox_records(self) -> set[DnsRecord]:
+        if ipaddress_tags:
+            queries.append(ips(Q(tags__in=ipaddress_tags)))
+        if interface_tags:
+            queries.append(assigned_to(Interface, Interface.objects.filter(tags__in=interface_tags)))
+            queries.append(assigned_to(VMInterface, VMInterface.objects.filter(tags__in=interface_tags)))
+        if device_tags:
+            queries.append(assigned_to(Interface, Interface.objects.filter(device__tags__in=device_tags)))
+            queries.append(assigned_to(VMInterface, VMInterface.objects.filter(virtual_machine__tags__in=device_tags)))
+        if fhrpgroup_tags:
+            queries.append(assigned_to(FHRPGroup, FHRPGroup.objects.filter(tags__in=fhrpgroup_tags)))
+        if device_roles:
+            queries.append(assigned_to(Interface, Interface.objects.filter(device__role__in=device_roles)))
+            queries.append(assigned_to(VMInterface, VMInterface.objects.filter(virtual_machine__role__in=device_roles)))
+        return [q.values_list("pk", flat=True) for q in queries if q is not None]
+
+    def get_reverse_address_queries(self, zone: Zone) -> list[QuerySet]:
+        """
+        Build query selecting primary keys of IPAddress objects within
+        network of reverse zone, without those in more specific reverse zones
+        (PTR records of these belong to other zones)
+        """
+        network = reverse_zone_network(zone.name)
+        if network is None:
+            self.log_warning(f"Unable to determine network of reverse zone {zone}")
+            return []
+        query = IPAddress.objects.filter(address__net_host_contained=str(network))
+        for other in Zone.get_index().zones.values():
+            if other.pk == zone.pk or not other.is_reverse:
+                continue
+            other_network = reverse_zone_network(other.name)
+            if other_network is not None and other_network in network and other_network != network:
+                query = query.exclude(address__net_host_contained=str(other_network))
+        return [query.values_list("pk", flat=True)]
+
+    def get_addresses(self, zone: Zone|None = None, ip_pks: set[int]|None = None) -> set[int]:
+        """
+        Get primary keys of IPAddress objects that could have DNS records,
+        only of those in ip_pks if given
+        """
+        pks = set()
+        for query in self.get_address_queries(zone):
+            if ip_pks is not None:
+                query = query.filter(pk__in=ip_pks)
+            pks.update(query)
+        return pks
+
+    def load_netbox_records(self, ip_pks: set[int]|None = None) -> set[DnsRecord]:
+        """
+        Records of zone for given addresses (all candidate addresses by
+        default). Given addresses that are not candidates of zone are left
+        out, same as in a full sync.
+        """
         records = set()
         ip: IPAddress
-        ip_addresses = self.get_addresses()
-        self.log_info(f"Found {ip_addresses.count()} matching addresses to check")
-        for ip in ip_addresses:
+        if ip_pks is None:
+            ip_pks = self.get_addresses()
+        elif ip_pks:
+            ip_pks = self.get_addresses(ip_pks=ip_pks)
+        self.log_info(f"Found {len(ip_pks)} matching addresses to check")
+        for ip in iter_prefetched_addresses(ip_pks):
             self.init_attrs()
             self.ip = ip
             self.make_fqdn()
             if not self.forward_zone:
-                self.log_info(f"No matching forward zone found for IP:{ip}. Skipping")
+                self.log_debug(f"No matching forward zone found for IP:{ip}. Skipping", "skipped_no_zone")
                 continue
             if not self.fqdn:
-                self.log_info(f"No FQDN could be determined for IP:{ip} (zone:{self.forward_zone}). Skipping")
+                self.log_debug(f"No FQDN could be determined for IP:{ip} (zone:{self.forward_zone}). Skipping", "skipped_no_fqdn")
                 continue
             if self.forward_zone == self.zone:
                 name = self.fqdn.replace(self.forward_zone.name, "").rstrip(".")
@@ -307,39 +967,180 @@ class PowerdnsTaskFullSync(PowerdnsTask):
                     data=str(ip.address.ip),
                     dns_type=FAMILY_TYPES.get(ip.family),
                     zone_name=self.forward_zone.name,
-                    ttl=get_ip_ttl(ip) or self.forward_zone.default_ttl,
+                    ttl=get_ip_ttl(ip, self.config) or self.forward_zone.default_ttl,
                 ))
             if self.zone.is_reverse:
-                reverse_fqdn = self.make_reverse_domain()
-                self.reverse_zone = Zone.get_best_zone(reverse_fqdn)
+                prefixlen = self.determine_reverse_zone()
                 if not self.reverse_zone:
-                    self.log_info(f"No matching reverse zone for {ip} ({self.fqdn}). Skipping")
+                    self.log_debug(f"No matching reverse zone for {ip} ({self.fqdn}). Skipping", "skipped_no_reverse_zone")
                     continue
                 if self.reverse_zone == self.zone:
-                    name = reverse_fqdn.replace(self.reverse_zone.name, "").rstrip(".")
                     records.add(DnsRecord(
-                        name=name,
+                        name=self.make_ptr_name(prefixlen),
                         data=self.fqdn,
                         dns_type=PTR_TYPE,
                         zone_name=self.reverse_zone.name,
-                        ttl=get_ip_ttl(ip) or self.reverse_zone.default_ttl,
+                        ttl=get_ip_ttl(ip, self.config) or self.reverse_zone.default_ttl,
                     ))
         return records
 
-    def load_pdns_records(self) -> set[DnsRecord]:
-        flat_records = set()
-        checked_types = [PTR_TYPE] + list(FAMILY_TYPES.values())
-        servers = self.get_pdns_servers_for_zone(self.zone.name)
+    def load_pdns_records(self, zone: Zone|None = None) -> dict[ApiServer, set[DnsRecord]]:
+        """
+        Read records of zone (task's zone by default) from all its servers
+        concurrently. Records are returned separately for each server, so
+        each server can be diffed on its own. With quorum write_policy a
+        server that cannot be read is left out (and counted as failed when
+        changes are applied), as long as enough servers remain.
+        """
+        zone = zone or self.zone
+        servers = self.get_pdns_servers_for_zone(zone.name)
         if not servers:
-            raise PowerdnsSyncNoServers(f"No valid servers found for zone {self.zone}")
-        for api_server in servers:
-            pdns_zone = api_server.api.get_zone(self.zone.name)
-            if not pdns_zone:
-                raise PowerdnsSyncServerZoneMissing(
-                    f"Zone {self.zone.name} not found on server {api_server}"
-                )
-            for record in pdns_zone.records:
-                if record["type"] not in checked_types:
+            raise PowerdnsSyncNoServers(f"No valid servers found for zone {zone}")
+
+        def fetch(api_server: ApiServer) -> tuple[powerdns.interface.PDNSZone, list[dict]]:
+            pdns_zone = self.get_pdns_zone(api_server, zone.name)
+            return pdns_zone, get_rrsets(pdns_zone)
+
+        quorum = self.config.write_policy == WRITE_POLICY_QUORUM
+        server_records = {}
+        unread = []
+        for api_server, (result, exception) in zip(servers, self.run_parallel(fetch, servers)):
+            if exception:
+                if not quorum or not isinstance(exception, (PowerdnsSyncServerZoneMissing, PDNSError, RequestException)):
+                    raise exception
+                self.log_failure(f"Unable to read zone {zone.name} from server {api_server}: {exception}")
+                unread.append(api_server)
+                continue
+            pdns_zone, rrsets = result
+            records = set()
+            for record in rrsets:
+                if record["type"] not in self.config.managed_types:
                     continue
-                flat_records.update(DnsRecord.from_pdns_record(record, pdns_zone))
-        return flat_records
+                records.update(DnsRecord.from_pdns_record(record, pdns_zone, self.config))
+            server_records[api_server] = records
+        self.unread_servers[zone.name] = unread
+        required = self.required_servers(len(servers))
+        if len(server_records) < required:
+            raise PowerdnsSyncServerError(
+                f"Zone {zone} could be read from {len(server_records)} of {len(servers)} servers, "
+                f"{required} required"
+            )
+        return server_records
+
+
+class PowerdnsTaskSyncAll(PowerdnsTaskFullSync):
+    """
+    Full sync of all enabled zones in one pass: candidate addresses of all
+    zones are loaded and named once, forward and PTR records are computed
+    for whichever zones they belong to, then each zone is diffed and pushed.
+    A zone that fails does not stop sync of other zones.
+    """
+    @classmethod
+    def run_sync_all(cls, job: Job, *args, plan: bool = False, **kwargs) -> None:
+        task = cls(job)
+        task.plan = plan
+
+        try:
+            task.log_debug("Starting sync of all zones")
+            task.job.start()
+            watermark, started = task.take_watermark()
+            zones = {zone.pk: zone for zone in Zone.objects.enabled()}
+            with task.phase_stats.phase("load_netbox_records"):
+                netbox_records = task.load_all_netbox_records(zones)
+            failed = []
+            for zone in zones.values():
+                try:
+                    task.sync_zone(zone, netbox_records.get(zone.name, set()))
+                    if not plan:
+                        task.save_watermark(watermark, started, full=True, zone=zone)
+                except Exception as e:
+                    task.log_failure(f"Sync of zone {zone} failed: `{type(e).__name__}: {e}`")
+                    failed.append(zone)
+            task.save_label_cache_stats()
+            task.save_phase_stats()
+            if failed:
+                task.log_failure(f"Sync failed for {len(failed)} of {len(zones)} zones")
+                task.terminate(status=JobStatusChoices.STATUS_ERRORED)
+            else:
+                task.log_success("Finished")
+                task.terminate()
+        except Exception as e:
+            stacktrace = traceback.format_exc()
+            task.log_failure(f"An exception occurred: `{type(e).__name__}: {e}`\n```\n{stacktrace}\n```")
+            task.save_phase_stats()
+            task.terminate(status=JobStatusChoices.STATUS_ERRORED)
+
+        # Schedule the next job if an interval has been set
+        if job.interval:
+            new_scheduled_time = next_scheduled_time(job)
+            Job.enqueue(
+                cls.run_sync_all,
+                instance=Zone(),
+                name=job.name,
+                user=job.user,
+                schedule_at=new_scheduled_time,
+                interval=job.interval,
+                plan=plan,
+            )
+
+    def load_all_netbox_records(self, zones: dict[int, Zone]) -> dict[str, set[DnsRecord]]:
+        """
+        Compute records of all given zones, returned per zone name. A record
+        is only added to a zone if address is one of that zone's candidate
+        addresses, so records are the same as run_full_sync() of the zone
+        computes.
+        """
+        candidates = {zone.pk: self.get_addresses(zone) for zone in zones.values()}
+        ip_pks = set().union(*candidates.values())
+        self.log_info(f"Found {len(ip_pks)} matching addresses in {len(zones)} zones to check")
+        records : dict[str, set[DnsRecord]] = {}
+        ip: IPAddress
+        for ip in iter_prefetched_addresses(ip_pks):
+            self.init_attrs()
+            self.ip = ip
+            self.make_fqdn()
+            if not self.forward_zone:
+                self.log_debug(f"No matching forward zone found for IP:{ip}. Skipping", "skipped_no_zone")
+                continue
+            if not self.fqdn:
+                self.log_debug(f"No FQDN could be determined for IP:{ip} (zone:{self.forward_zone}). Skipping", "skipped_no_fqdn")
+                continue
+            ttl = get_ip_ttl(ip, self.config)
+            if ip.pk in candidates.get(self.forward_zone.pk, ()):
+                name = self.fqdn.replace(self.forward_zone.name, "").rstrip(".")
+                records.setdefault(self.forward_zone.name, set()).add(DnsRecord(
+                    name=name,
+                    data=str(ip.address.ip),
+                    dns_type=FAMILY_TYPES.get(ip.family),
+                    zone_name=self.forward_zone.name,
+                    ttl=ttl or self.forward_zone.default_ttl,
+                ))
+            prefixlen = self.determine_reverse_zone()
+            if not self.reverse_zone:
+                self.log_debug(f"No matching reverse zone for {ip} ({self.fqdn}). Skipping", "skipped_no_reverse_zone")
+                continue
+            if ip.pk in candidates.get(self.reverse_zone.pk, ()):
+                records.setdefault(self.reverse_zone.name, set()).add(DnsRecord(
+                    name=self.make_ptr_name(prefixlen),
+                    data=self.fqdn,
+                    dns_type=PTR_TYPE,
+                    zone_name=self.reverse_zone.name,
+                    ttl=ttl or self.reverse_zone.default_ttl,
+                ))
+        return records
+
+    def sync_zone(self, zone: Zone, netbox_records: set[DnsRecord]) -> None:
+        """ Diff zone's records against each of its servers and push changes """
+        self.log_info(f"Zone {zone}: netbox records:{len(netbox_records)}")
+        with self.phase_stats.phase("load_pdns_records"):
+            server_records = self.load_pdns_records(zone)
+        change_sets = {}
+        with self.phase_stats.phase("diff"):
+            for api_server, pdns_records in server_records.items():
+                change_set = ChangeSet.from_records(zone.name, netbox_records, pdns_records, self.config)
+                change_sets[api_server] = change_set
+                self.log_info(
+                    f"Zone {zone} server {api_server}: pdns records:{len(pdns_records)} "
+                    f"rrsets to_replace:{change_set.replace_count} to_delete:{change_set.delete_count}"
+                )
+        self.push_server_change_sets(zone.name, change_sets)
@@ -0,0 +1,361 @@
+import dataclasses
+import json
+import multiprocessing
+import netaddr
+import random
+import resource
+import time
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q, QuerySet
+
+from core.models import Job
+from ipam.models import IPAddress
+
+from netbox_powerdns_sync.changeset import ChangeSet
+from netbox_powerdns_sync.client import api_request_count, client_registry, get_rrsets
+from netbox_powerdns_sync.constants import JOB_NAME_SYNC
+from netbox_powerdns_sync.exceptions import PowerdnsSyncServerError
+from netbox_powerdns_sync.fake_pdns import FakePowerDNS, FakePowerDNSAdapter
+from netbox_powerdns_sync.jobs import PowerdnsTask, PowerdnsTaskFullSync
+from netbox_powerdns_sync.models import ApiServer, Zone
+from netbox_powerdns_sync.record import DnsRecord
+from netbox_powerdns_sync.utils import make_canonical
+from netbox_powerdns_sync.zone_index import ZoneIndex
+
+
+def legacy_address_query(zone: Zone) -> QuerySet:
+    """ Candidate addresses selected by a single OR across all join paths, as get_addresses() used to """
+    zone_canonical = zone.name
+    zone_domain = zone.name.rstrip(".")
+    query_zone = Q(dns_name__endswith=zone_canonical)|Q(dns_name__endswith=zone_domain)
+    query_zone |= Q(interface__device__name__endswith=zone_canonical)|Q(interface__device__name__endswith=zone_domain)
+    query_zone |= Q(vminterface__virtual_machine__name__endswith=zone_canonical)|Q(vminterface__virtual_machine__name__endswith=zone_domain)
+    query_zone |= Q(fhrpgroup__name__endswith=zone_canonical)|Q(fhrpgroup__name__endswith=zone_domain)
+    query_zone |= Q(tags__in=zone.match_ipaddress_tags.all())
+    query_zone |= Q(interface__tags__in=zone.match_interface_tags.all())
+    query_zone |= Q(vminterface__tags__in=zone.match_interface_tags.all())
+    query_zone |= Q(interface__device__tags__in=zone.match_device_tags.all())
+    query_zone |= Q(vminterface__virtual_machine__tags__in=zone.match_device_tags.all())
+    query_zone |= Q(fhrpgroup__tags__in=zone.match_fhrpgroup_tags.all())
+    query_zone |= Q(interface__device__role__in=zone.match_device_roles.all())
+    query_zone |= Q(vminterface__virtual_machine__role__in=zone.match_device_roles.all())
+    results = IPAddress.objects.filter(query_zone)
+    if zone.match_interface_mgmt_only:
+        results = results.filter(interface__mgmt_only=True)
+    return results.values_list("pk", flat=True)
+
+
+class LegacyDnsRecord:
+    """ DnsRecord as it was before it used __slots__ and a cached hash """
+    def __init__(self, name:str, data:str, dns_type:str, zone_name:str, ttl:int):
+        self.name = name.replace(zone_name, "")
+        self.name = self.name.rstrip(".")
+        self.data = data
+        self.dns_type = dns_type
+        self.ttl = ttl
+        self.zone_name = zone_name
+
+    def __hash__(self) -> int:
+        return hash(tuple([self.name, self.dns_type, self.ttl, self.data, self.zone_name]))
+
+    def __eq__(self, other: "LegacyDnsRecord") -> bool:
+        return self.name == other.name and self.data == other.data and \
+            self.dns_type == other.dns_type and self.ttl == other.ttl and \
+            self.zone_name == other.zone_name
+
+
+def build_records(record_class: type, count: int, queue: multiprocessing.Queue) -> None:
+    """
+    Build two sets of records for a zone (as a full sync does for netbox and
+    PowerDNS side), diff them and report peak RSS growth and elapsed time.
+    Zone name strings are new objects for each record, like they are when
+    parsed from PowerDNS API JSON.
+    """
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    sets = []
+    for offset in (0, count // 100):
+        records = set()
+        for i in range(offset, count + offset):
+            zone_name = "".join(("example", ".com."))
+            records.add(record_class(
+                name=f"host-{i}.{zone_name}",
+                data=f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+                dns_type="A",
+                zone_name=zone_name,
+                ttl=3600,
+            ))
+        sets.append(records)
+    changed = len(sets[0] - sets[1]) + len(sets[1] - sets[0])
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((peak, peak - baseline, elapsed, changed))
+
+
+def reverse_zones(nested: int) -> list[SimpleNamespace]:
+    """
+    Reverse zones for the benchmark: 2001:db8::/32 with nested /48 zones
+    for its first subnets, and an IPv4 zone so both tables are populated
+    """
+    names = ["8.b.d.0.1.0.0.2.ip6.arpa.", "10.in-addr.arpa."]
+    for i in range(nested):
+        network = netaddr.IPNetwork(f"2001:db8:{i:x}::/48")
+        nibbles = network.ip.reverse_dns.split(".")[32 - network.prefixlen // 4:]
+        names.append(".".join(nibbles))
+    return [SimpleNamespace(name=name) for name in names]
+
+
+def legacy_reverse_lookup(index: ZoneIndex, addresses: list[netaddr.IPAddress]) -> int:
+    """ Reverse zone & PTR name by reverse_dns string suffix match, as jobs did before """
+    found = 0
+    for address in addresses:
+        reverse_fqdn = make_canonical(address.reverse_dns)
+        zone = index.get_best_zone(reverse_fqdn)
+        if zone:
+            reverse_fqdn.replace(zone.name, "").rstrip(".")
+            found += 1
+    return found
+
+
+def range_reverse_lookup(index: ZoneIndex, addresses: list[netaddr.IPAddress]) -> int:
+    """ Reverse zone & PTR name from integer range index """
+    found = 0
+    reverse = index.reverse
+    for address in addresses:
+        if reverse.get_ptr(address.version, int(address)):
+            found += 1
+    return found
+
+
+def plan_cost(queryset: QuerySet) -> float:
+    """ Total cost of query plan as estimated by PostgreSQL """
+    plan = json.loads(queryset.explain(format="json"))
+    return plan[0]["Plan"]["Total Cost"]
+
+
+def best_time(func, repeat: int) -> tuple[float, object]:
+    """ Run func repeat times, return shortest wall time and last result """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = "Benchmark performance sensitive parts of PowerDNS zone sync"
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest="benchmark", required=True)
+        addresses = subparsers.add_parser(
+            "addresses",
+            help="Compare candidate address selection against the single OR query",
+        )
+        addresses.add_argument(
+            "--zone", action="append", dest="zones", default=[],
+            help="Zone name to benchmark (can be repeated). Default: all enabled forward zones",
+        )
+        addresses.add_argument(
+            "--repeat", type=int, default=3,
+            help="Run each query this many times and report the fastest run",
+        )
+
+        records = subparsers.add_parser(
+            "records",
+            help="Compare peak memory of DnsRecord sets against the plain class used before",
+        )
+        records.add_argument(
+            "--count", type=int, default=500000,
+            help="Number of records in zone",
+        )
+
+        reverse = subparsers.add_parser(
+            "reverse",
+            help="Compare reverse zone & PTR name lookup by string suffix against the integer range index",
+        )
+        reverse.add_argument(
+            "--count", type=int, default=1000000,
+            help="Number of random IPv6 addresses",
+        )
+        reverse.add_argument(
+            "--nested", type=int, default=256,
+            help="Number of nested /48 reverse zones",
+        )
+        reverse.add_argument(
+            "--seed", type=int, default=0,
+            help="Seed for random addresses",
+        )
+
+        writes = subparsers.add_parser(
+            "writes",
+            help="Write and read back a zone through the in-process fake PowerDNS API",
+        )
+        writes.add_argument(
+            "--count", type=int, default=100000,
+            help="Number of rrsets written to zone",
+        )
+        writes.add_argument(
+            "--servers", type=int, default=2,
+            help="Number of fake API servers of zone",
+        )
+        writes.add_argument(
+            "--chunk-size", type=int, default=None,
+            help="Rrsets per PATCH request. Default: patch_chunk_size setting",
+        )
+        writes.add_argument(
+            "--latency", type=float, default=0.0,
+            help="Latency of each API request in milliseconds",
+        )
+        writes.add_argument(
+            "--error-rate", type=float, default=0.0,
+            help="Fraction of API requests that fail with status 500",
+        )
+        writes.add_argument(
+            "--rate-limit", type=float, default=None,
+            help="Requests per second accepted by each server, others fail with status 429",
+        )
+        writes.add_argument(
+            "--seed", type=int, default=0,
+            help="Seed for injected failures",
+        )
+
+    def handle(self, *args, **options):
+        getattr(self, f"benchmark_{options['benchmark']}")(**options)
+
+    def benchmark_addresses(self, zones: list[str], repeat: int, **options):
+        if zones:
+            zone_objects = list(Zone.objects.filter(name__in=zones))
+            missing = set(zones) - {z.name for z in zone_objects}
+            if missing:
+                raise CommandError(f"Unknown zones: {', '.join(sorted(missing))}")
+        else:
+            zone_objects = list(Zone.objects.enabled().forward())
+        for zone in zone_objects:
+            task = PowerdnsTaskFullSync(Job(object=zone, name=JOB_NAME_SYNC))
+            legacy = legacy_address_query(zone)
+            legacy_cost = plan_cost(legacy)
+            legacy_time, legacy_rows = best_time(lambda: list(legacy), repeat)
+            queries = task.get_address_queries()
+            narrow_cost = sum(plan_cost(q) for q in queries)
+            narrow_time, narrow_pks = best_time(task.get_addresses, repeat)
+            self.stdout.write(f"Zone {zone}")
+            self.stdout.write(
+                f"  single OR query: cost={legacy_cost:.2f} time={legacy_time:.3f}s "
+                f"rows={len(legacy_rows)} distinct={len(set(legacy_rows))}"
+            )
+            self.stdout.write(
+                f"  {len(queries)} narrow queries: cost={narrow_cost:.2f} time={narrow_time:.3f}s "
+                f"distinct={len(narrow_pks)}"
+            )
+            if set(legacy_rows) != narrow_pks:
+                self.stderr.write(self.style.WARNING(
+                    f"  results differ: only in OR query:{len(set(legacy_rows) - narrow_pks)} "
+                    f"only in narrow queries:{len(narrow_pks - set(legacy_rows))}"
+                ))
+
+    def benchmark_records(self, count: int, **options):
+        # each variant runs in its own forked process, so peak RSS of one
+        # does not hide peak of the other
+        context = multiprocessing.get_context("fork")
+        for label, record_class in (("plain class", LegacyDnsRecord), ("slotted DnsRecord", DnsRecord)):
+            queue = context.Queue()
+            process = context.Process(target=build_records, args=(record_class, count, queue))
+            process.start()
+            peak, growth, elapsed, changed = queue.get()
+            process.join()
+            self.stdout.write(
+                f"{label}: {count} records x2, peak RSS={peak / 1024:.1f}MiB "
+                f"(+{growth / 1024:.1f}MiB) time={elapsed:.2f}s diff={changed}"
+            )
+
+    def benchmark_reverse(self, count: int, nested: int, seed: int, **options):
+        # no database access, zones are plain objects with a name
+        rng = random.Random(seed)
+        base = int(netaddr.IPAddress("2001:db8::"))
+        # about half of addresses fall into one of the nested /48 zones
+        subnets = max(nested * 2, 1)
+        addresses = [
+            netaddr.IPAddress(base | rng.randrange(subnets) << 80 | rng.getrandbits(80), 6)
+            for _ in range(count)
+        ]
+        start = time.perf_counter()
+        index = ZoneIndex(reverse_zones(nested))
+        build = time.perf_counter() - start
+        self.stdout.write(f"{len(index)} zones, range index built in {build * 1000:.1f}ms")
+        for label, func in (("reverse_dns suffix match", legacy_reverse_lookup), ("integer range index", range_reverse_lookup)):
+            start = time.perf_counter()
+            found = func(index, addresses)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{label}: {count} addresses time={elapsed:.2f}s "
+                f"({elapsed / count * 1e9:.0f}ns/address) found={found}"
+            )
+
+    def benchmark_writes(self, count: int, servers: int, chunk_size: int|None, latency: float,
+                         error_rate: float, rate_limit: float|None, seed: int, **options):
+        # servers are not saved and fake API is mounted on their URLs, so
+        # nothing is written to database or sent over network
+        zone_name = "benchmark.example."
+        task = PowerdnsTask(Job(name=JOB_NAME_SYNC))
+        if chunk_size is not None:
+            task.config = dataclasses.replace(task.config, patch_chunk_size=chunk_size)
+        api_servers = []
+        adapters = []
+        for i in range(1, servers + 1):
+            api_server = ApiServer(pk=-i, name=f"fake-{i}", api_url=f"http://fake-pdns-{i}.invalid/api/v1", api_token="benchmark")
+            adapter = FakePowerDNSAdapter(
+                FakePowerDNS(zones=[zone_name]),
+                api_key="benchmark",
+                latency=latency / 1000,
+                error_rate=error_rate,
+                rate_limit=rate_limit,
+                seed=seed + i,
+            )
+            client_registry.mount(f"http://fake-pdns-{i}.invalid/", adapter)
+            api_servers.append(api_server)
+            adapters.append(adapter)
+        try:
+            change_set = ChangeSet(zone_name, task.config)
+            for i in range(count):
+                change_set.replace([DnsRecord(
+                    name=f"host-{i}",
+                    data=f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+                    dns_type="A",
+                    zone_name=zone_name,
+                    ttl=3600,
+                )])
+            requests = api_request_count()
+            start = time.perf_counter()
+            error = None
+            try:
+                task.apply_server_change_sets(zone_name, {api_server: change_set for api_server in api_servers})
+            except PowerdnsSyncServerError as e:
+                error = e
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"write: {count} rrsets to {servers} servers, chunk size={task.config.patch_chunk_size} "
+                f"time={elapsed:.2f}s ({count * servers / elapsed:.0f} rrsets/s) "
+                f"requests={api_request_count() - requests}"
+            )
+            if error:
+                self.stderr.write(self.style.WARNING(f"  {error}"))
+
+            start = time.perf_counter()
+            read = 0
+            for api_server in api_servers:
+                task.pdns_zones.clear()
+                pdns_zone = task.get_pdns_zone(api_server, zone_name)
+                for record in get_rrsets(pdns_zone):
+                    read += len(DnsRecord.from_pdns_record(record, pdns_zone, task.config))
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"read: {read} records from {servers} servers time={elapsed:.2f}s")
+        finally:
+            for i in range(1, servers + 1):
+                client_registry.unmount(f"http://fake-pdns-{i}.invalid/")
+        for api_server, adapter in zip(api_servers, adapters):
+            stats = ", ".join(f"{method} {status}:{n}" for (method, status), n in sorted(adapter.stats.items()))
+            self.stdout.write(f"  {api_server.name}: {stats}")
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_job'),
+        ('netbox_powerdns_sync', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('sequence', models.PositiveIntegerField()),
+                ('level', models.CharField(max_length=30)),
+                ('category', models.CharField(blank=True, max_length=50)),
+                ('message', models.TextField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.job')),
+            ],
+            options={
+                'verbose_name': 'Job log entry',
+                'verbose_name_plural': 'Job log entries',
+                'ordering': ('job', 'sequence'),
+                'indexes': [models.Index(fields=['job', 'sequence'], name='powerdns_sync_joblog_seq')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_job'),
+        ('netbox_powerdns_sync', '0002_joblogentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncAction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('action', models.CharField(max_length=30)),
+                ('zone', models.CharField(max_length=200)),
+                ('server', models.CharField(max_length=100)),
+                ('rrset', models.TextField()),
+                ('status', models.CharField(max_length=30)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.job')),
+            ],
+            options={
+                'verbose_name': 'Sync action',
+                'ordering': ('-job', 'pk'),
+            },
+        ),
+    ]
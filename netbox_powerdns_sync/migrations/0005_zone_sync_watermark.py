@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_powerdns_sync', '0004_outboxentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zone',
+            name='sync_watermark',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='zone',
+            name='last_full_sync',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
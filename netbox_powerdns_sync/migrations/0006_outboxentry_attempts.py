@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_powerdns_sync', '0005_zone_sync_watermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxentry',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='outboxentry',
+            name='next_attempt',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
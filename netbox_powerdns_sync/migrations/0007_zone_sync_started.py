@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_powerdns_sync', '0006_outboxentry_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zone',
+            name='sync_started',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
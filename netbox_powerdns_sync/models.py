@@ -2,25 +2,35 @@ import powerdns
 from django.contrib.contenttypes.models import ContentType
 from django.core.validators import MinLengthValidator
 from django.db import models
+from django.db.models import Count, Max
 from django.forms import ValidationError
 from django.urls import reverse
 from taggit.managers import TaggableManager
+from utilities.querysets import RestrictedQuerySet
 from core.models import Job
-from dcim.models import DeviceRole, Interface
-from ipam.models import IPAddress, FHRPGroup
+from extras.choices import LogLevelChoices
+from extras.plugins.utils import get_plugin_config
+from dcim.models import DeviceRole
+from ipam.models import IPAddress
 from netbox.models import NetBoxModel
 from extras.models import Tag
-from virtualization.models import VMInterface
 
-from .choices import NamingFgrpGroupChoices, NamingDeviceChoices, NamingIpChoices
-from .constants import JOB_NAME_SYNC
+from .choices import NamingFgrpGroupChoices, NamingDeviceChoices, NamingIpChoices, SyncActionChoices, SyncStatusChoices
+from .client import client_registry
+from .constants import JOB_NAME_SYNC, JOB_NAME_SYNC_PLAN, PLUGIN_NAME
+from .exceptions import PowerdnsSyncNamingError
 from .querysets import EnabledQuerySet, ZoneQuerySet
-from .utils import get_ip_host, make_canonical, is_reverse
+from .registry import naming_registry
+from .utils import is_reverse
 from .validators import hostname_validator, zone_validator
+from .zone_index import ZoneIndex, ZoneMatcher
 
 
 __all__ = (
     "ApiServer",
+    "JobLogEntry",
+    "OutboxEntry",
+    "SyncAction",
     "Zone",
 )
 
@@ -68,14 +78,16 @@ class ApiServer(NetBoxModel):
         return self.name
 
     @property
-    def api(self) -> powerdns.PDNSEndpoint|None:
+    def api(self) -> powerdns.interface.PDNSServer|None:
         if not self.api_url or not self.api_url:
             return None
-        api_client = powerdns.PDNSApiClient(
-            api_endpoint=self.api_url,
-            api_key=self.api_token,
+        return client_registry.get_server(
+            self.pk,
+            self.api_url,
+            self.api_token,
+            timeout=get_plugin_config(PLUGIN_NAME, "api_timeout"),
+            pool_size=get_plugin_config(PLUGIN_NAME, "api_pool_size"),
         )
-        return powerdns.PDNSEndpoint(api_client).servers[0]
 
 
 class Zone(NetBoxModel):
@@ -174,6 +186,24 @@ class Zone(NetBoxModel):
         default=None,
         null=True,
     )
+    sync_watermark = models.BigIntegerField(
+        help_text="Last change log entry included in zone sync",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    last_full_sync = models.DateTimeField(
+        help_text="When all records of zone were last synced",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    sync_started = models.DateTimeField(
+        help_text="Start of last zone sync, when sync watermark was taken",
+        null=True,
+        blank=True,
+        editable=False,
+    )
     # netbox-plugin-dns also has Zone model
     # if both plugins are installed, django complains:
     #   netbox_dns.Zone.tags: (fields.E304) Reverse accessor 'Tag.zone_set'
@@ -193,6 +223,10 @@ class Zone(NetBoxModel):
 
     objects = ZoneQuerySet.as_manager()
 
+    # process wide ZoneIndex and ZoneMatcher, see get_index() & get_matcher()
+    _index = None
+    _matcher = None
+
     def clean_fields(self, exclude=None):
         if self.is_reverse and self.is_default:
             msg = "Reverse zone cannot be set as default"
@@ -206,6 +240,18 @@ class Zone(NetBoxModel):
         )):
             raise ValidationError("At least one of naming methods must be set")
 
+        errors = {}
+        for field in ("naming_ip_method", "naming_device_method", "naming_fgrpgroup_method"):
+            path = getattr(self, field)
+            if not path:
+                continue
+            try:
+                naming_registry.get(path)
+            except PowerdnsSyncNamingError as e:
+                errors[field] = str(e)
+        if errors:
+            raise ValidationError(errors)
+
     def delete(self, *args, **kwargs):
         # delete any scheduled jobs for this zone
         if self.pk:
@@ -213,81 +259,57 @@ class Zone(NetBoxModel):
                 object_type_id=ContentType.objects.get_for_model(self).pk,
                 object_id=self.pk,
                 status="scheduled",
-                name=JOB_NAME_SYNC
+                name__in=(JOB_NAME_SYNC, JOB_NAME_SYNC_PLAN),
             )
             jobs.delete()
         return super().delete(*args, **kwargs)
 
+    @classmethod
+    def get_index(cls, revalidate: bool = False) -> ZoneIndex:
+        """
+        Return process wide index of zone names. Index is built on first use
+        and dropped when a zone is saved or deleted (see signals). With
+        revalidate, one aggregate query checks if zones were changed by some
+        other process and rebuilds the index if needed.
+        """
+        stamp = None
+        if revalidate or cls._index is None:
+            stamp = tuple(cls.objects.aggregate(
+                count=Count("pk"),
+                last_updated=Max("last_updated"),
+            ).values())
+        if cls._index is None or (revalidate and cls._index.stamp != stamp):
+            cls._index = ZoneIndex(cls.objects.all(), stamp=stamp)
+            cls._matcher = None
+        return cls._index
+
+    @classmethod
+    def invalidate_index(cls) -> None:
+        cls._index = None
+        cls._matcher = None
+
     @classmethod
     def get_best_zone(cls, name: str) -> "Zone|None":
         """ Get the longest matching zone for a given name """
-        name = make_canonical(name)
-        best_match = None
-        for zone in cls.objects.all():
-            if name.endswith(zone.name):
-                if not best_match or len(best_match.name) < len(zone.name):
-                    best_match = zone
-        return best_match
+        return cls.get_index().get_best_zone(name)
 
     @classmethod
-    def match_ip(cls, ip:IPAddress) -> "[Zone]":
+    def get_matcher(cls) -> ZoneMatcher:
+        """
+        Return process wide copy of zone matchers. Like the zone index it is
+        built on first use and dropped when zones change.
+        """
+        if cls._matcher is None:
+            cls._matcher = ZoneMatcher.load(cls)
+        return cls._matcher
+
+    @classmethod
+    def match_ip(cls, ip:IPAddress) -> "list[Zone]":
         """
         For a given IPAddress figure out the correct zones based on
         IPAddress, Interface, Device ir FHRPGroup tags or Device role.
         """
-        def filter_mgmt_only(zones, ip):
-            """ Checks if IP is assigned to interface.mgmt_only=True and finds matching zones """
-            if not zones:
-                # no results, just return
-                return zones
-            if not any(zones.values_list("match_interface_mgmt_only", flat=True)):
-                # no zones are constrained to mgmt_only
-                return zones
-            if ip.interface.filter(mgmt_only=True):
-                # IP is assigned to mgmt_only interface, return matching zones
-                return zones.filter(match_interface_mgmt_only=True)
-            else:
-                # or just return zones
-                return zones
-
-        # tag on IPAddress
-        zones = cls.objects.filter(match_ipaddress_tags__in=ip.tags.all())
-        zones = filter_mgmt_only(zones, ip)
-        if zones:
-            return zones
-        if isinstance(ip.assigned_object, Interface) or \
-            isinstance(ip.assigned_object, VMInterface):
-            # tag on Interface or VMInterface
-            zones = cls.objects.filter(match_interface_tags__in=ip.assigned_object.tags.all())
-            zones = filter_mgmt_only(zones, ip)
-            if zones:
-                return zones
-            # tag on Device or VirtualMachine
-            host = get_ip_host(ip)
-            zones = cls.objects.filter(match_device_tags__in=host.tags.all())
-            zones = filter_mgmt_only(zones, ip)
-            if zones:
-                return zones
-        if isinstance(ip.assigned_object, FHRPGroup):
-            zones = cls.objects.filter(match_fhrpgroup_tags__in=ip.assigned_object.tags.all())
-            zones = filter_mgmt_only(zones, ip)
-            if zones:
-                return zones
-        host = get_ip_host(ip)
-        role = None
-        if host:
-            role = host.role
-        if role:
-            zones = cls.objects.filter(match_device_roles__in=[role])
-            zones = filter_mgmt_only(zones, ip)
-            if zones:
-                return zones
-        # default zone
-        zones = cls.objects.filter(is_default=True)
-        zones = filter_mgmt_only(zones, ip)
-        if zones:
-            return zones
-        return cls.objects.none()
+        return cls.get_matcher().match_ip(ip)
 
     clone_fields = (
         "name", "description", "api_servers", "default_ttl",
@@ -313,3 +335,113 @@ class Zone(NetBoxModel):
 
     def __str__(self):
         return self.name
+
+
+class JobLogEntry(models.Model):
+    """
+    Job log messages that did not fit into job.data (see joblog.JobLogSink),
+    kept only if job_log_overflow setting is enabled.
+    """
+    job = models.ForeignKey(
+        to=Job,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    sequence = models.PositiveIntegerField()
+    level = models.CharField(
+        max_length=30,
+        choices=LogLevelChoices,
+    )
+    category = models.CharField(
+        max_length=50,
+        blank=True,
+    )
+    message = models.TextField()
+
+    class Meta:
+        ordering = ("job", "sequence")
+        verbose_name = "Job log entry"
+        verbose_name_plural = "Job log entries"
+        indexes = [
+            models.Index(fields=["job", "sequence"], name="powerdns_sync_joblog_seq"),
+        ]
+
+    def __str__(self):
+        return f"{self.job_id}:{self.sequence} {self.message}"
+
+
+class SyncAction(models.Model):
+    """
+    A single rrset change sent to a PowerDNS server by a job. Zone & server
+    are stored by name, so actions are kept after these are deleted.
+    """
+    job = models.ForeignKey(
+        to=Job,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    action = models.CharField(
+        max_length=30,
+        choices=SyncActionChoices,
+    )
+    zone = models.CharField(
+        max_length=200,
+    )
+    server = models.CharField(
+        max_length=100,
+    )
+    rrset = models.TextField(
+        verbose_name="Record",
+    )
+    status = models.CharField(
+        max_length=30,
+        choices=SyncStatusChoices,
+    )
+
+    objects = RestrictedQuerySet.as_manager()
+
+    class Meta:
+        ordering = ("-job", "pk")
+        verbose_name = "Sync action"
+
+    def __str__(self):
+        return f"{self.action} {self.rrset}"
+
+    def get_action_color(self):
+        return SyncActionChoices.colors.get(self.action)
+
+    def get_status_color(self):
+        return SyncStatusChoices.colors.get(self.status)
+
+
+class OutboxEntry(models.Model):
+    """
+    IP address whose DNS records need to be updated. Written by signal
+    handlers in the same transaction as the change that caused it and
+    processed by the outbox drainer job (see jobs.PowerdnsTaskOutbox).
+    Address is referenced by id only, it may be deleted before the entry
+    is processed.
+    """
+    ip_id = models.BigIntegerField()
+    reason = models.CharField(
+        max_length=100,
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+    )
+    # failed attempts so far, and time entry can be claimed by a drainer again
+    attempts = models.PositiveIntegerField(
+        default=0,
+    )
+    next_attempt = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    class Meta:
+        ordering = ("pk",)
+        verbose_name = "Outbox entry"
+        verbose_name_plural = "Outbox entries"
+
+    def __str__(self):
+        return f"{self.reason} IP:{self.ip_id}"
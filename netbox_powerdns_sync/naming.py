@@ -1,38 +1,26 @@
-import importlib
 from dcim.models import Interface
 from ipam.models import IPAddress, FHRPGroup
 from virtualization.models import VMInterface
 
 from .models import Zone
-from .utils import make_dns_label, make_canonical
-
-
-def _load_class(path:str) -> object:
-    try:
-        module_path, class_name = path.rsplit(".", maxsplit=1)
-        module = importlib.import_module(module_path)
-        klass = getattr(module, class_name)
-        return klass
-    except:
-        return None
+from .registry import naming_registry
+from .utils import make_dns_label, make_dns_name, make_canonical
 
 
 def generate_fqdn(ip: IPAddress, zone:Zone) -> str|None:
+    """
+    Try zone's IP, device and FHRP group naming methods in turn until one
+    returns a name. Raises PowerdnsSyncNamingError for misconfigured methods.
+    """
     fqdn = None
     if not zone:
         return None
-    if zone.naming_ip_method:
-        klass = _load_class(zone.naming_ip_method)
-        naming_method = klass(ip, zone)
-        fqdn = naming_method.make_fqdn()
-    if not fqdn and zone.naming_device_method:
-        klass = _load_class(zone.naming_device_method)
-        naming_method = klass(ip, zone)
-        fqdn = naming_method.make_fqdn()
-    if not fqdn and zone.naming_fgrpgroup_method:
-        klass = _load_class(zone.naming_fgrpgroup_method)
-        naming_method = klass(ip, zone)
-        fqdn = naming_method.make_fqdn()
+    for method in (zone.naming_ip_method, zone.naming_device_method, zone.naming_fgrpgroup_method):
+        if not method:
+            continue
+        fqdn = naming_registry.get(method)(ip, zone).make_fqdn()
+        if fqdn:
+            break
     return fqdn
 
 
@@ -76,9 +64,8 @@ class NamingDeviceByInterfacePrimary(NamingBase):
     def make_name(self) -> str|None:
         self._populate_host_interface()
         if self.host:
-            name = self.host.name
-            name = ".".join(map(make_dns_label, name.split(".")))
-            if self.ip != self.host.primary_ip4 and self.ip != self.host.primary_ip6:
+            name = make_dns_name(self.host.name)
+            if self.ip.pk not in (self.host.primary_ip4_id, self.host.primary_ip6_id):
                 name = make_dns_label(self.interface.name) + "." + name
             return name
 
@@ -88,8 +75,7 @@ class NamingDeviceByInterface(NamingBase):
     def make_name(self) -> str|None:
         self._populate_host_interface()
         if self.host:
-            name = self.host.name
-            name = ".".join(map(make_dns_label, name.split(".")))
+            name = make_dns_name(self.host.name)
             name = make_dns_label(self.interface.name) + "." + name
             return name
 
@@ -99,8 +85,7 @@ class NamingDeviceName(NamingBase):
     def make_name(self) -> str|None:
         self._populate_host_interface()
         if self.host:
-            name = self.host.name
-            name = ".".join(map(make_dns_label, name.split(".")))
+            name = make_dns_name(self.host.name)
             return name
 
 
@@ -121,5 +106,4 @@ class NamingFGRPGroupName(NamingBase):
     """ Use FGRPGroup name: fgrp-group.zone """
     def make_name(self) -> str|None:
         if isinstance(self.ip.assigned_object, FHRPGroup):
-            name = self.ip.assigned_object.name
-            name = ".".join(map(make_dns_label, name.split(".")))
+            name = make_dns_name(self.ip.assigned_object.name)
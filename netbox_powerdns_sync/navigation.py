@@ -38,4 +38,9 @@ menu_items = (
         link_text='Sync Jobs',
         permissions=["core.view_job"],
     ),
+    PluginMenuItem(
+        link='plugins:netbox_powerdns_sync:syncaction_list',
+        link_text='Sync Actions',
+        permissions=["netbox_powerdns_sync.view_syncaction"],
+    ),
 )
@@ -0,0 +1,52 @@
+from typing import Iterable, Iterator
+from django.db.models import prefetch_related_objects
+from dcim.models import Interface
+from ipam.models import IPAddress, FHRPGroup
+from virtualization.models import VMInterface
+
+
+PREFETCH_CHUNK_SIZE = 2000
+
+
+def prefetch_addresses(ip_addresses: list[IPAddress]) -> list[IPAddress]:
+    """
+    Load everything that naming methods and zone matchers read from a list of
+    IPAddress objects: tags, assigned (VM)interfaces or FHRP groups, their
+    tags, hosts (Device or VirtualMachine) with tags and roles.
+
+    Query count does not depend on number of addresses. Related objects end up
+    in Django's relation caches, so code that accesses ip.assigned_object,
+    interface.device, host.tags.all() etc. does not hit the database.
+    """
+    prefetch_related_objects(ip_addresses, "tags", "assigned_object")
+    # several IPs can share the same assigned object, only prefetch it once
+    interfaces = {}
+    vminterfaces = {}
+    fhrpgroups = {}
+    for ip in ip_addresses:
+        assigned_object = ip.assigned_object
+        if isinstance(assigned_object, Interface):
+            interfaces[assigned_object.pk] = assigned_object
+        elif isinstance(assigned_object, VMInterface):
+            vminterfaces[assigned_object.pk] = assigned_object
+        elif isinstance(assigned_object, FHRPGroup):
+            fhrpgroups[assigned_object.pk] = assigned_object
+    if interfaces:
+        prefetch_related_objects(list(interfaces.values()), "tags", "device__tags", "device__role")
+    if vminterfaces:
+        prefetch_related_objects(list(vminterfaces.values()), "tags", "virtual_machine__tags", "virtual_machine__role")
+    if fhrpgroups:
+        prefetch_related_objects(list(fhrpgroups.values()), "tags")
+    return ip_addresses
+
+
+def iter_prefetched_addresses(pks: Iterable[int], chunk_size: int = PREFETCH_CHUNK_SIZE) -> Iterator[IPAddress]:
+    """
+    Iterate over IPAddress objects with given primary keys in chunks,
+    prefetching related objects for each chunk with prefetch_addresses().
+    Duplicate keys are ignored.
+    """
+    pks = sorted(set(pks))
+    for start in range(0, len(pks), chunk_size):
+        chunk = list(IPAddress.objects.filter(pk__in=pks[start:start + chunk_size]).order_by("pk"))
+        yield from prefetch_addresses(chunk)
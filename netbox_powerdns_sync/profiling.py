@@ -0,0 +1,39 @@
+import time
+from contextlib import contextmanager
+from django.db import connection
+
+from .client import api_request_count
+
+
+class PhaseStats:
+    """
+    Wall time, number of SQL queries and number of PowerDNS API requests of
+    named phases of a job (e.g. load_netbox_records, write). A phase that is
+    entered several times (once per zone) adds up.
+
+    SQL queries are counted on the job's own database connection. API requests
+    are counted for the whole process, which is fine as a worker runs one job
+    at a time.
+    """
+    def __init__(self) -> None:
+        self.phases : dict[str, dict] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        requests = api_request_count()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(count_query):
+                yield
+        finally:
+            stats = self.phases.setdefault(name, {"time": 0.0, "sql_queries": 0, "http_requests": 0})
+            stats["time"] = round(stats["time"] + time.perf_counter() - start, 3)
+            stats["sql_queries"] += queries
+            stats["http_requests"] += api_request_count() - requests
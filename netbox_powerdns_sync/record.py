@@ -1,21 +1,31 @@
 import powerdns
+import sys
 
-from .utils import can_manage_record, get_managed_comment
+from .config import SyncConfig, can_manage_record, get_managed_comment
 
 
 class DnsRecord:
+    """
+    A single DNS record. Full syncs keep hundreds of thousands of these in
+    sets, so instances use __slots__, compute their hash once and share
+    (intern) zone name & type strings. Treat instances as immutable.
+    """
+    __slots__ = ("name", "data", "dns_type", "ttl", "zone_name", "_hash")
+
     def __init__(self, name:str, data:str, dns_type:str, zone_name:str, ttl:int):
-        self.name = name.replace(zone_name, "")
-        self.name = self.name.rstrip(".")
+        if name.endswith(zone_name):
+            name = name[:-len(zone_name)]
+        self.name = name.rstrip(".")
         self.data = data
-        self.dns_type = dns_type
+        self.dns_type = sys.intern(dns_type)
         self.ttl = ttl
-        self.zone_name = zone_name
+        self.zone_name = sys.intern(zone_name)
+        self._hash = hash((self.name, self.dns_type, self.ttl, self.data, self.zone_name))
 
     @classmethod
-    def from_pdns_record(cls, record:dict, zone:powerdns.interface.PDNSZone) -> tuple['DnsRecord']:
+    def from_pdns_record(cls, record:dict, zone:powerdns.interface.PDNSZone, config:SyncConfig|None = None) -> tuple['DnsRecord']:
         dns_records = set()
-        if not can_manage_record(record):
+        if not can_manage_record(record, config):
             return set()
         for content in record["records"]:
             dns_record = cls(
@@ -28,16 +38,23 @@ class DnsRecord:
             dns_records.add(dns_record)
         return dns_records
 
-    def as_rrset(self) -> powerdns.RRSet:
-        return powerdns.RRSet(self.name, self.dns_type, [self.data], ttl=self.ttl, comments=get_managed_comment())
+    @property
+    def fqdn(self) -> str:
+        """ Canonical owner name of record """
+        if self.name:
+            return f"{self.name}.{self.zone_name}"
+        return self.zone_name
+
+    def as_rrset(self, config:SyncConfig|None = None) -> powerdns.RRSet:
+        return powerdns.RRSet(self.name, self.dns_type, [self.data], ttl=self.ttl, comments=get_managed_comment(config))
 
     def __hash__(self) -> int:
-        return hash(tuple([self.name, self.dns_type, self.ttl, self.data, self.zone_name]))
+        return self._hash
 
     def __eq__(self, other: "DnsRecord") -> bool:
-        return self.name == other.name and self.data == other.data and \
-            self.dns_type == other.dns_type and self.ttl == other.ttl and \
-            self.zone_name == other.zone_name
+        return self._hash == other._hash and self.name == other.name and \
+            self.data == other.data and self.dns_type == other.dns_type and \
+            self.ttl == other.ttl and self.zone_name == other.zone_name
 
     def __repr__(self) -> str:
         return f"<DNSRecord: {self}>"
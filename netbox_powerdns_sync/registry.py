@@ -0,0 +1,78 @@
+import importlib
+import logging
+import threading
+from importlib.metadata import entry_points
+
+from .choices import NamingDeviceChoices, NamingFgrpGroupChoices, NamingIpChoices
+from .exceptions import PowerdnsSyncNamingError
+
+
+logger = logging.getLogger("netbox.netbox_powerdns_sync.registry")
+
+# entry point groups other packages can use to register their own naming
+# methods, and choice sets these naming methods are added to
+NAMING_ENTRY_POINT_GROUPS = {
+    "netbox_powerdns_sync.naming_ip": NamingIpChoices,
+    "netbox_powerdns_sync.naming_device": NamingDeviceChoices,
+    "netbox_powerdns_sync.naming_fhrpgroup": NamingFgrpGroupChoices,
+}
+
+
+class NamingRegistry:
+    """
+    Resolves naming method class paths (as stored in Zone.naming_*_method)
+    to classes. Each path is imported and validated once per process.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._classes: dict[str, type] = {}
+
+    def register(self, path: str, klass: type, choice_set: type|None = None, label: str|None = None) -> None:
+        """ Register class under path and optionally offer it as a choice in choice_set """
+        self._validate(path, klass)
+        with self._lock:
+            self._classes[path] = klass
+        if choice_set is not None and path not in dict(choice_set.CHOICES):
+            choice = (path, label or getattr(klass, "label", None) or klass.__name__)
+            choice_set.CHOICES.append(choice)
+            if hasattr(choice_set, "_choices"):
+                choice_set._choices.append(choice)
+
+    def get(self, path: str) -> type:
+        """ Return naming class for path, raise PowerdnsSyncNamingError if path is not valid """
+        klass = self._classes.get(path)
+        if klass is not None:
+            return klass
+        klass = self._import(path)
+        self._validate(path, klass)
+        with self._lock:
+            self._classes[path] = klass
+        return klass
+
+    def load_entry_points(self) -> None:
+        """ Register naming methods from installed packages' entry points """
+        for group, choice_set in NAMING_ENTRY_POINT_GROUPS.items():
+            for entry_point in entry_points(group=group):
+                try:
+                    klass = entry_point.load()
+                    path = f"{klass.__module__}.{klass.__qualname__}"
+                    self.register(path, klass, choice_set=choice_set, label=getattr(klass, "label", entry_point.name))
+                except Exception as e:
+                    logger.error(f"Unable to load naming method {entry_point.name} ({entry_point.value}): {e}")
+
+    @staticmethod
+    def _import(path: str) -> type:
+        try:
+            module_path, class_name = path.rsplit(".", maxsplit=1)
+            module = importlib.import_module(module_path)
+            return getattr(module, class_name)
+        except (ValueError, ImportError, AttributeError) as e:
+            raise PowerdnsSyncNamingError(f"Unable to load naming method {path}: {e}")
+
+    @staticmethod
+    def _validate(path: str, klass: type) -> None:
+        if not isinstance(klass, type) or not callable(getattr(klass, "make_fqdn", None)):
+            raise PowerdnsSyncNamingError(f"Naming method {path} is not a class with make_fqdn() method")
+
+
+naming_registry = NamingRegistry()
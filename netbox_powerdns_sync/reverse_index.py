@@ -0,0 +1,152 @@
+import netaddr
+import re
+from bisect import bisect_right
+from typing import Iterable
+
+
+def reverse_zone_network(name: str) -> netaddr.IPNetwork|None:
+    """
+    Network covered by reverse zone name, e.g. 10.in-addr.arpa. -> 10.0.0.0/8
+    and 8.b.d.0.1.0.0.2.ip6.arpa. -> 2001:db8::/32. RFC 2317 classless zones
+    are supported with the first label as <start>/<length>, <start>-<length>
+    or <start>-<end> (e.g. 64-26.2.0.192.in-addr.arpa. -> 192.0.2.64/26 and
+    0-31.2.0.192.in-addr.arpa. -> 192.0.2.0/27). A <start>-<n> label is read
+    as a range when n > start and start..n is an aligned block of at least 4
+    addresses, otherwise as prefix length, so 28-31 is 192.0.2.28/30 and not
+    192.0.2.28/31. Returns None for names that are not valid reverse zones.
+    """
+    name = name.lower()
+    if not name.endswith("."):
+        name += "."
+    if name.endswith(".in-addr.arpa.") or name == "in-addr.arpa.":
+        labels = name[:-len("in-addr.arpa.")].rstrip(".")
+        labels = labels.split(".") if labels else []
+        classless = labels[0] if labels and not labels[0].isdigit() else None
+        octets = labels[1:] if classless else labels
+        if len(octets) > 4 or (classless and len(octets) != 3):
+            return None
+        if not all(o.isdigit() and int(o) <= 255 for o in octets):
+            return None
+        octets = list(reversed(octets))
+        prefix_len = 8 * len(octets)
+        if classless:
+            parts = re.fullmatch(r"(\d+)[/-](\d+)", classless)
+            if not parts:
+                return None
+            start, second = int(parts.group(1)), int(parts.group(2))
+            if start > 255:
+                return None
+            size = second - start + 1
+            if "/" not in classless and size >= 4 and not size & (size - 1) and not start % size:
+                # <start>-<end> range of an aligned CIDR block
+                prefix_len = 32 - (size.bit_length() - 1)
+            else:
+                prefix_len = second
+            if not 24 < prefix_len <= 32:
+                return None
+            octets.append(str(start))
+        address = ".".join(octets + ["0"] * (4 - len(octets)))
+        network = netaddr.IPNetwork(f"{address}/{prefix_len}")
+    elif name.endswith(".ip6.arpa.") or name == "ip6.arpa.":
+        nibbles = name[:-len("ip6.arpa.")].rstrip(".")
+        nibbles = nibbles.split(".") if nibbles else []
+        if len(nibbles) > 32 or not all(len(n) == 1 and n in "0123456789abcdef" for n in nibbles):
+            return None
+        value = int("".join(reversed(nibbles)) or "0", 16) << (4 * (32 - len(nibbles)))
+        network = netaddr.IPNetwork(f"{netaddr.IPAddress(value, 6)}/{4 * len(nibbles)}")
+    else:
+        return None
+    if network.network != network.ip:
+        # host bits set, e.g. 65/26
+        return None
+    return network
+
+
+# hex digit strings for building ip6.arpa names from integers
+_NIBBLES = "0123456789abcdef"
+
+
+class ReverseZoneIndex:
+    """
+    Reverse zones as sorted, non-overlapping integer ranges of addresses,
+    one table per IP version. Nested zones are flattened, so each range maps
+    to the most specific zone covering it and a lookup is a single bisect.
+    """
+    def __init__(self, zones: Iterable) -> None:
+        ranges = {4: [], 6: []}
+        for zone in zones:
+            network = reverse_zone_network(zone.name)
+            if network is not None:
+                ranges[network.version].append((network.first, network.last, network.prefixlen, zone))
+        self.tables = {}
+        for version, version_ranges in ranges.items():
+            starts, ends, entries = [], [], []
+            for start, end, entry in self._flatten(version_ranges):
+                starts.append(start)
+                ends.append(end)
+                entries.append(entry)
+            self.tables[version] = (starts, ends, entries)
+
+    @staticmethod
+    def _flatten(ranges: list[tuple]) -> list[tuple]:
+        """
+        Flatten ranges of networks (which are either nested or disjoint) into
+        non-overlapping (start, end, (prefixlen, zone)) ranges
+        """
+        ranges = sorted(ranges, key=lambda r: (r[0], -r[1]))
+        flat = []
+        stack = []
+        cursor = 0
+
+        def emit(start, end, entry):
+            if start > end:
+                return
+            if flat and flat[-1][2] is entry and flat[-1][1] + 1 == start:
+                flat[-1] = (flat[-1][0], end, entry)
+            else:
+                flat.append((start, end, entry))
+
+        for start, end, prefixlen, zone in ranges:
+            while stack and stack[-1][0] < start:
+                top_end, entry = stack.pop()
+                emit(cursor, top_end, entry)
+                cursor = top_end + 1
+            if stack:
+                emit(cursor, start - 1, stack[-1][1])
+            stack.append((end, (prefixlen, zone)))
+            cursor = start
+        while stack:
+            top_end, entry = stack.pop()
+            emit(cursor, top_end, entry)
+            cursor = top_end + 1
+        return flat
+
+    def lookup(self, version: int, value: int) -> tuple[int, object]|None:
+        """ (prefix length, zone) of most specific reverse zone for address as integer """
+        starts, ends, entries = self.tables[version]
+        i = bisect_right(starts, value) - 1
+        if i >= 0 and value <= ends[i]:
+            return entries[i]
+        return None
+
+    def get_zone(self, version: int, value: int) -> object|None:
+        entry = self.lookup(version, value)
+        return entry[1] if entry else None
+
+    def get_ptr(self, version: int, value: int) -> tuple[object, str]|None:
+        """
+        Reverse zone and PTR owner name (relative to zone) for address as
+        integer. Names in RFC 2317 classless zones are the last octet only.
+        """
+        entry = self.lookup(version, value)
+        if entry is None:
+            return None
+        prefixlen, zone = entry
+        return zone, ptr_name(version, value, prefixlen)
+
+
+def ptr_name(version: int, value: int, prefixlen: int) -> str:
+    """ PTR owner name of address (as integer) relative to reverse zone with prefix length """
+    if version == 4:
+        return ".".join(str(value >> shift & 0xff) for shift in range(0, 32 - prefixlen // 8 * 8, 8))
+    return ".".join(_NIBBLES[value >> shift & 0xf] for shift in range(0, 128 - prefixlen // 4 * 4, 4))
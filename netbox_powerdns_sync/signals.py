@@ -1,10 +1,8 @@
 import logging
 
 from django.dispatch import receiver
-from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 
-from core.models import Job
 from dcim.models import Device, Interface
 from extras.plugins.utils import get_plugin_config
 from ipam.models import IPAddress, FHRPGroup
@@ -12,7 +10,9 @@ from netbox.context import current_request
 from virtualization.models import VirtualMachine, VMInterface
 
 from .constants import JOB_NAME_DEVICE, JOB_NAME_INTERFACE, JOB_NAME_IP, PLUGIN_NAME
-from .jobs import PowerdnsTaskIP
+from .client import client_registry
+from .coalesce import enqueue_ip_update
+from .models import ApiServer, Zone
 from .utils import find_objectchange_ip
 
 
@@ -52,15 +52,8 @@ def update_ipaddress_dns(instance, **kwargs):
     if not changed:
         # nothing interesting changed, nothing to do
         return
-    job_args = dict(
-        func=PowerdnsTaskIP.run_update_ip,
-        instance=instance,
-        name=JOB_NAME_IP,
-    )
     request = current_request.get()
-    if request:
-        job_args["user"] = request.user
-    transaction.on_commit(lambda: Job.enqueue(**job_args))
+    enqueue_ip_update(instance, JOB_NAME_IP, user=request.user if request else None)
 
 
 @receiver(post_save, sender=Interface)
@@ -81,17 +74,9 @@ def update_interface_dns(instance: FHRPGroup, **kwargs):
     if not changed:
         # nothing interesting changed, nothing to do
         return
-    # need to create job for IPv4 and IPv6
-    job_args = dict(
-        func=PowerdnsTaskIP.run_update_ip,
-        name=JOB_NAME_INTERFACE,
-    )
     request = current_request.get()
-    if request:
-        job_args["user"] = request.user
     for ip_address in instance.ip_addresses.all():
-        job_args["instance"] = ip_address
-        transaction.on_commit(lambda: Job.enqueue(**job_args))
+        enqueue_ip_update(ip_address, JOB_NAME_INTERFACE, user=request.user if request else None)
 
 
 @receiver(post_save, sender=Device)
@@ -112,32 +97,28 @@ def update_device_dns(instance, **kwargs):
         # nothing interesting changed, nothing to do
         return
     request = current_request.get()
-    # need to create job for IPv4 and IPv6
-    if instance.primary_ip4:
-        enqueue_task = True
-        job_args = dict(
-            func=PowerdnsTaskIP.run_update_ip,
-            instance=instance.primary_ip4,
-            name=JOB_NAME_DEVICE,
-        )
-        if request:
-            job_args["user"] = request.user
-            # check if IPAddress object was creted in same request
-            q_created = find_objectchange_ip(instance.primary_ip4, request.id)
-            enqueue_task = not q_created.exists()
-        if enqueue_task:
-            transaction.on_commit(lambda: Job.enqueue(**job_args))
-    if instance.primary_ip6:
-        enqueue_task = True
-        job_args = dict(
-            func=PowerdnsTaskIP.run_update_ip,
-            instance=instance.primary_ip6,
-            name=JOB_NAME_DEVICE,
-        )
-        if request:
-            job_args["user"] = request.user
-            # check if IPAddress object was creted in same request
-            q_created = find_objectchange_ip(instance.primary_ip6, request.id)
-            enqueue_task = not q_created.exists()
-        if enqueue_task:
-            transaction.on_commit(lambda: Job.enqueue(**job_args))
+    # need to update IPv4 and IPv6 address
+    for ip_address in (instance.primary_ip4, instance.primary_ip6):
+        if not ip_address:
+            continue
+        # check if IPAddress object was creted in same request
+        if request and find_objectchange_ip(ip_address, request.id).exists():
+            continue
+        enqueue_ip_update(ip_address, JOB_NAME_DEVICE, user=request.user if request else None)
+
+
+@receiver(post_save, sender=Zone)
+@receiver(post_delete, sender=Zone)
+@receiver(m2m_changed, sender=Zone.match_ipaddress_tags.through)
+@receiver(m2m_changed, sender=Zone.match_interface_tags.through)
+@receiver(m2m_changed, sender=Zone.match_device_tags.through)
+@receiver(m2m_changed, sender=Zone.match_fhrpgroup_tags.through)
+@receiver(m2m_changed, sender=Zone.match_device_roles.through)
+def invalidate_zone_index(**kwargs):
+    Zone.invalidate_index()
+
+
+@receiver(post_save, sender=ApiServer)
+@receiver(post_delete, sender=ApiServer)
+def invalidate_api_client(instance, **kwargs):
+    client_registry.invalidate(instance.pk)
@@ -7,11 +7,13 @@ from . import models
 
 __all__ = (
     "ApiServerTable",
+    "SyncActionTable",
     "SyncJobTable",
     "ZoneTable",
 )
 
 SYNC_URL_ID = """<a href="{% url 'plugins:netbox_powerdns_sync:sync_result' job_pk=value %}">{{ value }}</a>"""
+SYNC_URL_ACTION_JOB = """<a href="{% url 'plugins:netbox_powerdns_sync:sync_result' job_pk=record.job_id %}">{{ record.job_id }}</a>"""
 SYNC_URL_NAME = """<a href="{% url 'plugins:netbox_powerdns_sync:sync_result' job_pk=record.id %}">{{ value }}</a>"""
 DEVICE_ROLE_COLUMN = """
 {% for role in value.all %}
@@ -56,6 +58,23 @@ class ApiServerTable(NetBoxTable):
         default_columns = ("pk", "name", "zone_count", "description", "enabled")
 
 
+class SyncActionTable(NetBoxTable):
+    id = tables.Column()
+    job = tables.TemplateColumn(
+        template_code=SYNC_URL_ACTION_JOB,
+    )
+    action = columns.ChoiceFieldColumn()
+    status = columns.ChoiceFieldColumn()
+    actions = columns.ActionsColumn(
+        actions=(),
+    )
+
+    class Meta(NetBoxTable.Meta):
+        model = models.SyncAction
+        fields = ("id", "job", "action", "zone", "server", "rrset", "status")
+        default_columns = ("job", "action", "zone", "server", "rrset", "status")
+
+
 class SyncJobTable(JobTable):
     id = tables.TemplateColumn(
         template_code=SYNC_URL_ID,
@@ -0,0 +1,71 @@
+import unittest
+
+from netbox_powerdns_sync.changeset import ChangeSet
+
+from .utils import MANAGED_COMMENT, ZONE, a, make_config
+
+
+class ChangeSetFromRecordsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.config = make_config()
+
+    def from_records(self, desired, actual) -> ChangeSet:
+        return ChangeSet.from_records(ZONE, desired, actual, self.config)
+
+    def test_unchanged(self):
+        records = [a("www", "192.0.2.1"), a("www", "192.0.2.2"), a("mail", "192.0.2.3")]
+        change_set = self.from_records(records, list(reversed(records)))
+        self.assertEqual(len(change_set), 0)
+        self.assertEqual(change_set.chunks(), [])
+
+    def test_create(self):
+        change_set = self.from_records([a("www", "192.0.2.2"), a("www", "192.0.2.1")], [])
+        self.assertEqual(change_set.replace_count, 1)
+        self.assertEqual(change_set.delete_count, 0)
+        rrset = list(change_set)[0]
+        self.assertEqual(rrset["name"], "www.example.com.")
+        self.assertEqual(rrset["type"], "A")
+        self.assertEqual(rrset["changetype"], "REPLACE")
+        self.assertEqual([r["content"] for r in rrset["records"]], ["192.0.2.1", "192.0.2.2"])
+        self.assertEqual([c["content"] for c in rrset["comments"]], [MANAGED_COMMENT])
+
+    def test_replace_whole_rrset(self):
+        # one added value replaces the rrset with all its desired values
+        change_set = self.from_records(
+            [a("www", "192.0.2.1"), a("www", "192.0.2.2")],
+            [a("www", "192.0.2.1")],
+        )
+        self.assertEqual(change_set.replace_count, 1)
+        rrset = list(change_set)[0]
+        self.assertEqual([r["content"] for r in rrset["records"]], ["192.0.2.1", "192.0.2.2"])
+
+    def test_ttl_change(self):
+        # changed TTL is a single REPLACE, not a delete and a create
+        change_set = self.from_records([a("www", "192.0.2.1", ttl=300)], [a("www", "192.0.2.1", ttl=3600)])
+        self.assertEqual(change_set.replace_count, 1)
+        self.assertEqual(change_set.delete_count, 0)
+        self.assertEqual(list(change_set)[0]["ttl"], 300)
+
+    def test_lowest_ttl(self):
+        change_set = self.from_records([a("www", "192.0.2.1", ttl=600), a("www", "192.0.2.2", ttl=300)], [])
+        self.assertEqual(list(change_set)[0]["ttl"], 300)
+
+    def test_delete(self):
+        change_set = self.from_records(
+            [a("www", "192.0.2.1")],
+            [a("www", "192.0.2.1"), a("old", "192.0.2.8"), a("old", "192.0.2.9")],
+        )
+        self.assertEqual(change_set.replace_count, 0)
+        self.assertEqual(change_set.delete_count, 1)
+        rrset = list(change_set)[0]
+        self.assertEqual(rrset["name"], "old.example.com.")
+        self.assertEqual(rrset["changetype"], "DELETE")
+
+    def test_zone_apex(self):
+        change_set = self.from_records([a("", "192.0.2.1")], [])
+        self.assertEqual(list(change_set)[0]["name"], ZONE)
+
+    def test_chunks(self):
+        change_set = self.from_records([a(f"host{i}", "192.0.2.1") for i in range(5)], [])
+        self.assertEqual([len(chunk) for chunk in change_set.chunks(2)], [2, 2, 1])
+        self.assertEqual([len(chunk) for chunk in change_set.chunks()], [5])
@@ -0,0 +1,108 @@
+import time
+import unittest
+from powerdns.exceptions import PDNSError
+
+from netbox_powerdns_sync.changeset import ChangeSet
+from netbox_powerdns_sync.client import client_registry, get_rrsets
+from netbox_powerdns_sync.fake_pdns import FakePowerDNS, FakePowerDNSAdapter
+from netbox_powerdns_sync.record import DnsRecord
+
+from .utils import MANAGED_COMMENT, ZONE, a, make_config
+
+
+API_PREFIX = "http://pdns.test/"
+API_URL = "http://pdns.test/api/v1"
+API_KEY = "secret"
+
+
+class FakePowerDNSTestCase(unittest.TestCase):
+    """ PowerDNS API client & ChangeSet against FakePowerDNSAdapter mounted on client sessions """
+    def setUp(self):
+        self.config = make_config()
+        self.backend = FakePowerDNS(zones=[ZONE])
+        self.adapter = FakePowerDNSAdapter(self.backend, api_key=API_KEY)
+        client_registry.mount(API_PREFIX, self.adapter)
+
+    def tearDown(self):
+        client_registry.unmount(API_PREFIX)
+
+    def get_zone(self, api_key: str = API_KEY):
+        server = client_registry.get_server(1, API_URL, api_key)
+        return server.get_zone(ZONE)
+
+    def read_records(self) -> set[DnsRecord]:
+        pdns_zone = self.get_zone()
+        records = set()
+        for record in get_rrsets(pdns_zone):
+            records.update(DnsRecord.from_pdns_record(record, pdns_zone, self.config))
+        return records
+
+    def sync(self, desired: list[DnsRecord]) -> ChangeSet:
+        pdns_zone = self.get_zone()
+        change_set = ChangeSet.from_records(ZONE, desired, self.read_records(), self.config)
+        for chunk in change_set.chunks(self.config.patch_chunk_size):
+            change_set.send(pdns_zone, chunk)
+        return change_set
+
+    def test_round_trip(self):
+        desired = {a("www", "192.0.2.1"), a("www", "192.0.2.2"), a("mail", "192.0.2.3", ttl=300)}
+        change_set = self.sync(desired)
+        self.assertEqual(change_set.replace_count, 2)
+        self.assertEqual(self.read_records(), desired)
+        rrsets = {(r["name"], r["type"]): r for r in self.backend.rrsets(ZONE)}
+        self.assertEqual(rrsets[("mail.example.com.", "A")]["ttl"], 300)
+        self.assertEqual(
+            [c["content"] for c in rrsets[("www.example.com.", "A")]["comments"]],
+            [MANAGED_COMMENT],
+        )
+        self.assertEqual(self.adapter.stats[("PATCH", 204)], 1)
+
+        # second sync: change TTL, drop a value and an rrset in one PATCH
+        desired = {a("www", "192.0.2.1", ttl=600)}
+        change_set = self.sync(desired)
+        self.assertEqual((change_set.replace_count, change_set.delete_count), (1, 1))
+        self.assertEqual(self.read_records(), desired)
+        self.assertEqual(self.adapter.stats[("PATCH", 204)], 2)
+
+        # nothing left to change
+        self.assertEqual(len(self.sync(desired)), 0)
+        self.assertEqual(self.adapter.stats[("PATCH", 204)], 2)
+
+    def test_unmanaged_records(self):
+        # records without managed comment are not read and never deleted
+        self.backend.add_zone(ZONE, [
+            {"name": "ns.example.com.", "type": "A", "records": [{"content": "192.0.2.53"}]},
+        ])
+        self.sync([a("www", "192.0.2.1")])
+        self.assertEqual(self.read_records(), {a("www", "192.0.2.1")})
+        self.assertIn(("ns.example.com.", "A"), self.backend.zones[ZONE])
+
+    def test_patch_all_or_nothing(self):
+        pdns_zone = self.get_zone()
+        change_set = ChangeSet(ZONE, self.config)
+        change_set.replace([a("www", "192.0.2.1")])
+        change_set.replace([a("www", "192.0.2.2", zone_name="example.org.")])
+        with self.assertRaises(PDNSError) as cm:
+            change_set.send(pdns_zone, list(change_set))
+        self.assertEqual(cm.exception.status_code, 422)
+        self.assertIn("out of zone", cm.exception.message)
+        # valid rrset of rejected PATCH was not applied either
+        self.assertEqual(self.backend.rrsets(ZONE), [])
+
+    def test_rate_limit(self):
+        pdns_zone = self.get_zone()
+        # empty token bucket, next request is over the limit
+        self.adapter.rate_limit = 1.0
+        self.adapter.tokens = 0.0
+        self.adapter.last_refill = time.monotonic()
+        change_set = ChangeSet.from_records(ZONE, [a("www", "192.0.2.1")], [], self.config)
+        with self.assertRaises(PDNSError) as cm:
+            change_set.send(pdns_zone, list(change_set))
+        self.assertEqual(cm.exception.status_code, 429)
+        self.assertEqual(self.backend.rrsets(ZONE), [])
+        self.assertEqual(self.adapter.stats[("PATCH", 429)], 1)
+
+    def test_wrong_api_key(self):
+        with self.assertRaises(PDNSError) as cm:
+            self.get_zone(api_key="wrong")
+        self.assertEqual(cm.exception.status_code, 401)
@@ -0,0 +1,52 @@
+import unittest
+
+try:
+    from django.core.exceptions import AppRegistryNotReady, ImproperlyConfigured
+except ImportError:
+    AppRegistryNotReady = ImproperlyConfigured = ImportError
+
+try:
+    from core.models import Job
+    from extras.choices import LogLevelChoices
+    from netbox_powerdns_sync.joblog import JobLogSink, tail_log
+except (ImportError, AppRegistryNotReady, ImproperlyConfigured):
+    # job log needs NetBox, e.g. pytest outside of NetBox
+    JobLogSink = None
+
+
+@unittest.skipIf(JobLogSink is None, "requires NetBox")
+class JobLogSinkTestCase(unittest.TestCase):
+    def test_first_and_latest(self):
+        job = Job()
+        sink = JobLogSink(job, max_entries=10)
+        for i in range(100):
+            sink.log(LogLevelChoices.LOG_WARNING if i == 50 else LogLevelChoices.LOG_INFO, f"message {i}")
+        sink.log(LogLevelChoices.LOG_FAILURE, "failed")
+        sink.log(LogLevelChoices.LOG_SUCCESS, "Finished")
+        sink.flush()
+        sequences = [entry["sequence"] for entry in job.data["log"]]
+        self.assertEqual(sequences, [0, 1, 2, 3, 4, 50, 96, 97, 98, 99, 100, 101])
+        self.assertEqual(job.data["log"][-2]["message"], "failed")
+        self.assertEqual(job.data["log_total"], 102)
+        self.assertEqual(job.data["log_dropped"], 90)
+
+    def test_tail_log(self):
+        job = Job()
+        sink = JobLogSink(job, max_entries=4)
+        for i in range(10):
+            sink.log(LogLevelChoices.LOG_INFO, f"message {i}")
+        sink.flush()
+        entries, offset = tail_log(job, 1, limit=2)
+        self.assertEqual([sequence for sequence, entry in entries], [1, 8])
+        entries, offset = tail_log(job, offset)
+        self.assertEqual([sequence for sequence, entry in entries], [9])
+        self.assertEqual(offset, 10)
+
+    def test_unlimited(self):
+        job = Job()
+        sink = JobLogSink(job, max_entries=None)
+        for i in range(10):
+            sink.log(LogLevelChoices.LOG_INFO, f"message {i}")
+        sink.flush()
+        self.assertEqual(len(job.data["log"]), 10)
+        self.assertNotIn("log_dropped", job.data)
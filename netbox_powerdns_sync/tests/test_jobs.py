@@ -0,0 +1,128 @@
+import unittest
+
+from netbox_powerdns_sync.changeset import ChangeSet
+from netbox_powerdns_sync.client import client_registry
+from netbox_powerdns_sync.constants import JOB_NAME_SYNC, WRITE_POLICY_ALL, WRITE_POLICY_QUORUM
+from netbox_powerdns_sync.fake_pdns import FakePowerDNS, FakePowerDNSAdapter
+
+from .utils import ZONE, a, make_config
+
+try:
+    from django.core.exceptions import AppRegistryNotReady, ImproperlyConfigured
+except ImportError:
+    AppRegistryNotReady = ImproperlyConfigured = ImportError
+
+try:
+    from django.test import TestCase
+    from core.models import Job
+    from ipam.models import IPAddress
+    from netbox_powerdns_sync.exceptions import PowerdnsSyncServerError
+    from netbox_powerdns_sync.jobs import PowerdnsTask, PowerdnsTaskFullSync
+    from netbox_powerdns_sync.models import ApiServer, Zone
+except (ImportError, AppRegistryNotReady, ImproperlyConfigured):
+    # jobs need NetBox and its database, e.g. pytest outside of NetBox
+    TestCase = unittest.TestCase
+    PowerdnsTask = None
+
+
+API_KEY = "secret"
+
+
+@unittest.skipIf(PowerdnsTask is None, "requires NetBox")
+class WritePolicyTestCase(TestCase):
+    """ apply_server_change_sets() against three fake servers, one (or more) failing every request """
+    def setUp(self):
+        self.servers = {}
+        for i in range(1, 4):
+            prefix = f"http://pdns{i}.test/"
+            adapter = FakePowerDNSAdapter(FakePowerDNS(zones=[ZONE]), api_key=API_KEY)
+            client_registry.mount(prefix, adapter)
+            api_server = ApiServer.objects.create(name=f"pdns{i}", api_url=f"{prefix}api/v1", api_token=API_KEY)
+            self.servers[api_server] = adapter
+        self.record = a("www", "192.0.2.1")
+
+    def tearDown(self):
+        for api_server in self.servers:
+            client_registry.unmount(api_server.api_url[:-len("api/v1")])
+
+    def make_task(self, write_policy: str, failing: int) -> PowerdnsTask:
+        task = PowerdnsTask(Job(name=JOB_NAME_SYNC))
+        task.config = make_config(write_policy=write_policy)
+        for api_server in self.servers:
+            # zones are looked up first, so only the PATCH requests fail
+            task.get_pdns_zone(api_server, ZONE)
+        for adapter in list(self.servers.values())[:failing]:
+            adapter.error_rate = 1.0
+        return task
+
+    def apply(self, task: PowerdnsTask) -> None:
+        change_set = ChangeSet(ZONE, task.config)
+        change_set.replace([self.record])
+        task.apply_server_change_sets(ZONE, {api_server: change_set for api_server in self.servers})
+
+    def applied(self) -> list[bool]:
+        return [bool(adapter.backend.rrsets(ZONE)) for adapter in self.servers.values()]
+
+    def test_all_fails_on_one_server(self):
+        task = self.make_task(WRITE_POLICY_ALL, failing=1)
+        with self.assertRaises(PowerdnsSyncServerError):
+            self.apply(task)
+        self.assertEqual(self.applied(), [False, True, True])
+
+    def test_quorum_tolerates_one_server(self):
+        task = self.make_task(WRITE_POLICY_QUORUM, failing=1)
+        self.apply(task)
+        self.assertEqual(self.applied(), [False, True, True])
+        self.assertEqual(list(self.servers.values())[0].stats[("PATCH", 500)], 1)
+
+    def test_quorum_fails_without_majority(self):
+        task = self.make_task(WRITE_POLICY_QUORUM, failing=2)
+        with self.assertRaises(PowerdnsSyncServerError):
+            self.apply(task)
+        self.assertEqual(self.applied(), [False, False, True])
+
+    def test_unread_server_counts_as_failed(self):
+        task = self.make_task(WRITE_POLICY_QUORUM, failing=1)
+        # records of second server could not be read by load_pdns_records()
+        task.unread_servers[ZONE] = [list(self.servers)[1]]
+        servers = list(self.servers)
+        change_set = ChangeSet(ZONE, task.config)
+        change_set.replace([self.record])
+        with self.assertRaises(PowerdnsSyncServerError):
+            task.apply_server_change_sets(ZONE, {servers[0]: change_set, servers[2]: change_set})
+
+
+@unittest.skipIf(PowerdnsTask is None, "requires NetBox")
+class IncrementalSyncTestCase(TestCase):
+    """ Changed addresses passed to load_netbox_records() are limited to candidates of zone """
+    def setUp(self):
+        naming = "netbox_powerdns_sync.naming.NamingIpDnsName"
+        self.zone = Zone.objects.create(name=ZONE, naming_ip_method=naming)
+        self.sub_zone = Zone.objects.create(name=f"sub.{ZONE}", naming_ip_method=naming)
+        self.default_zone = Zone.objects.create(
+            name="example.net.",
+            is_default=True,
+            naming_ip_method="netbox_powerdns_sync.naming.NamingIpReverse",
+        )
+        self.ip = IPAddress.objects.create(address="192.0.2.1/24", dns_name=f"www.{ZONE}")
+        # belongs to more specific zone
+        self.sub_ip = IPAddress.objects.create(address="192.0.2.2/24", dns_name=f"www.sub.{ZONE}")
+        # no zone matches, default zone is used, but address is not its candidate
+        self.other_ip = IPAddress.objects.create(address="192.0.2.3/24")
+
+    def load(self, zone: "Zone", ip_pks: set[int]|None) -> set[str]:
+        task = PowerdnsTaskFullSync(Job(name=JOB_NAME_SYNC, object=zone))
+        return {record.data for record in task.load_netbox_records(ip_pks)}
+
+    def test_other_zone(self):
+        changed = {self.ip.pk, self.sub_ip.pk, self.other_ip.pk}
+        self.assertEqual(self.load(self.zone, changed), {"192.0.2.1"})
+        self.assertEqual(self.load(self.zone, changed), self.load(self.zone, None))
+
+    def test_default_zone_candidates(self):
+        changed = {self.ip.pk, self.sub_ip.pk, self.other_ip.pk}
+        self.assertEqual(self.load(self.default_zone, changed), self.load(self.default_zone, None))
+        self.assertNotIn("192.0.2.3", self.load(self.default_zone, changed))
+
+    def test_nothing_changed(self):
+        self.assertEqual(self.load(self.zone, set()), set())
@@ -0,0 +1,129 @@
+import netaddr
+import unittest
+from types import SimpleNamespace
+
+from netbox_powerdns_sync.reverse_index import ReverseZoneIndex, ptr_name, reverse_zone_network
+
+
+def zone(name: str) -> SimpleNamespace:
+    return SimpleNamespace(name=name)
+
+
+def address(ip: str) -> tuple[int, int]:
+    ip = netaddr.IPAddress(ip)
+    return ip.version, int(ip)
+
+
+class ReverseZoneNetworkTestCase(unittest.TestCase):
+    def assertNetwork(self, name: str, network: str|None) -> None:
+        result = reverse_zone_network(name)
+        self.assertEqual(str(result) if result is not None else None, network, name)
+
+    def test_ipv4(self):
+        self.assertNetwork("in-addr.arpa.", "0.0.0.0/0")
+        self.assertNetwork("10.in-addr.arpa.", "10.0.0.0/8")
+        self.assertNetwork("2.0.192.in-addr.arpa.", "192.0.2.0/24")
+        self.assertNetwork("2.0.192.in-addr.arpa", "192.0.2.0/24")
+        self.assertNetwork("2.0.192.IN-ADDR.ARPA.", "192.0.2.0/24")
+
+    def test_ipv6(self):
+        self.assertNetwork("8.b.d.0.1.0.0.2.ip6.arpa.", "2001:db8::/32")
+        self.assertNetwork("0.8.b.d.0.1.0.0.2.ip6.arpa.", "2001:db8::/36")
+
+    def test_classless_prefix_length(self):
+        self.assertNetwork("64/26.2.0.192.in-addr.arpa.", "192.0.2.64/26")
+        self.assertNetwork("64-26.2.0.192.in-addr.arpa.", "192.0.2.64/26")
+        self.assertNetwork("28-31.2.0.192.in-addr.arpa.", "192.0.2.28/30")
+
+    def test_classless_range(self):
+        self.assertNetwork("0-31.2.0.192.in-addr.arpa.", "192.0.2.0/27")
+        self.assertNetwork("128-255.2.0.192.in-addr.arpa.", "192.0.2.128/25")
+
+    def test_invalid(self):
+        self.assertNetwork("example.com.", None)
+        self.assertNetwork("256.2.0.192.in-addr.arpa.", None)
+        self.assertNetwork("1.2.0.192.10.in-addr.arpa.", None)
+        # host bits set
+        self.assertNetwork("65-26.2.0.192.in-addr.arpa.", None)
+        # neither a valid prefix length nor an aligned block of 4 or more
+        self.assertNetwork("0-1.2.0.192.in-addr.arpa.", None)
+        self.assertNetwork("16-47.2.0.192.in-addr.arpa.", None)
+        self.assertNetwork("64-26.0.192.in-addr.arpa.", None)
+        self.assertNetwork("g.8.b.d.0.1.0.0.2.ip6.arpa.", None)
+
+
+class PtrNameTestCase(unittest.TestCase):
+    def test_ipv4(self):
+        self.assertEqual(ptr_name(*address("192.0.2.1"), 24), "1")
+        self.assertEqual(ptr_name(*address("192.0.2.1"), 16), "1.2")
+        self.assertEqual(ptr_name(*address("10.1.2.3"), 8), "3.2.1")
+
+    def test_ipv4_classless(self):
+        # names in classless zones are the last octet only
+        self.assertEqual(ptr_name(*address("192.0.2.65"), 26), "65")
+        self.assertEqual(ptr_name(*address("192.0.2.29"), 30), "29")
+
+    def test_ipv6(self):
+        self.assertEqual(
+            ptr_name(*address("2001:db8::1"), 32),
+            "1.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0",
+        )
+        self.assertEqual(ptr_name(*address("2001:db8::abcd"), 112), "d.c.b.a")
+        # prefix length that is not a multiple of 4 rounds down to a nibble
+        self.assertEqual(ptr_name(*address("2001:db8::abcd"), 114), "d.c.b.a")
+
+
+class ReverseZoneIndexTestCase(unittest.TestCase):
+    def test_flatten_nested(self):
+        outer, inner, innermost = "outer", "inner", "innermost"
+        flat = ReverseZoneIndex._flatten([
+            (0, 255, 24, outer),
+            (64, 127, 26, inner),
+            (64, 67, 30, innermost),
+        ])
+        self.assertEqual(flat, [
+            (0, 63, (24, outer)),
+            (64, 67, (30, innermost)),
+            (68, 127, (26, inner)),
+            (128, 255, (24, outer)),
+        ])
+
+    def test_flatten_disjoint(self):
+        flat = ReverseZoneIndex._flatten([
+            (256, 511, 24, "b"),
+            (0, 255, 24, "a"),
+            (1024, 1279, 24, "c"),
+        ])
+        self.assertEqual([(start, end) for start, end, entry in flat], [(0, 255), (256, 511), (1024, 1279)])
+        self.assertEqual([entry[1] for start, end, entry in flat], ["a", "b", "c"])
+
+    def test_flatten_same_start(self):
+        flat = ReverseZoneIndex._flatten([(0, 63, 26, "inner"), (0, 255, 24, "outer")])
+        self.assertEqual(flat, [(0, 63, (26, "inner")), (64, 255, (24, "outer"))])
+
+    def test_lookup(self):
+        zones = {
+            name: zone(name) for name in (
+                "192.in-addr.arpa.",
+                "2.0.192.in-addr.arpa.",
+                "64-26.2.0.192.in-addr.arpa.",
+                "8.b.d.0.1.0.0.2.ip6.arpa.",
+                "example.com.",
+            )
+        }
+        index = ReverseZoneIndex(zones.values())
+        self.assertEqual(index.lookup(*address("192.0.2.1")), (24, zones["2.0.192.in-addr.arpa."]))
+        self.assertEqual(index.lookup(*address("192.0.2.65")), (26, zones["64-26.2.0.192.in-addr.arpa."]))
+        self.assertEqual(index.lookup(*address("192.0.2.128")), (24, zones["2.0.192.in-addr.arpa."]))
+        self.assertEqual(index.lookup(*address("192.0.3.1")), (8, zones["192.in-addr.arpa."]))
+        self.assertEqual(index.lookup(*address("2001:db8::1")), (32, zones["8.b.d.0.1.0.0.2.ip6.arpa."]))
+        self.assertIsNone(index.lookup(*address("10.0.0.1")))
+        self.assertIsNone(index.lookup(*address("2001:db9::1")))
+
+    def test_get_ptr(self):
+        classless = zone("64-26.2.0.192.in-addr.arpa.")
+        index = ReverseZoneIndex([zone("192.in-addr.arpa."), classless])
+        self.assertEqual(index.get_ptr(*address("192.0.2.65")), (classless, "65"))
+        self.assertEqual(index.get_ptr(*address("192.0.2.1"))[1], "1.2.0")
+        self.assertIsNone(index.get_ptr(*address("10.0.0.1")))
+        self.assertIs(index.get_zone(*address("192.0.2.65")), classless)
@@ -0,0 +1,37 @@
+from dataclasses import replace
+from powerdns import Comment
+
+from netbox_powerdns_sync.config import SyncConfig
+from netbox_powerdns_sync.constants import FAMILY_TYPES, PTR_TYPE
+from netbox_powerdns_sync.record import DnsRecord
+
+
+MANAGED_COMMENT = "netbox-powerdns-sync"
+ZONE = "example.com."
+
+# plugin default settings, without reading them from NetBox
+DEFAULT_CONFIG = SyncConfig(
+    ttl_custom_field=None,
+    managed_comment=MANAGED_COMMENT,
+    comments=(Comment(MANAGED_COMMENT),),
+    managed_types=frozenset([PTR_TYPE, *FAMILY_TYPES.values()]),
+    patch_chunk_size=1000,
+    api_max_workers=4,
+    write_policy="all",
+    job_log_level="info",
+    job_log_max_entries=1000,
+    job_log_overflow=False,
+    full_sync_interval=None,
+    outbox_enabled=False,
+    outbox_batch_size=1000,
+)
+
+
+def make_config(**kwargs) -> SyncConfig:
+    """ SyncConfig with plugin defaults, overridden by kwargs """
+    return replace(DEFAULT_CONFIG, **kwargs)
+
+
+def a(name: str, data: str, ttl: int = 3600, zone_name: str = ZONE) -> DnsRecord:
+    """ A record relative to zone """
+    return DnsRecord(name=name, data=data, dns_type="A", zone_name=zone_name, ttl=ttl)
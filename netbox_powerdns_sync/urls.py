@@ -23,7 +23,9 @@ urlpatterns = (
     path('zones/<int:pk>/', include(get_model_urls('netbox_powerdns_sync', 'zone'))),
 
     path('sync/', views.SyncJobsView.as_view(), name='sync_jobs'),
+    path('sync/actions/', views.SyncActionListView.as_view(), name='syncaction_list'),
     path('sync/schedule/', views.SyncScheduleView.as_view(), name='sync_schedule'),
     path('sync/<int:job_pk>/', views.SyncResultView.as_view(), name='sync_result'),
+    path('sync/<int:job_pk>/tail/<str:kind>/', views.SyncResultTailView.as_view(), name='sync_result_tail'),
 
 )
@@ -1,15 +1,22 @@
 import re
 import unicodedata
-from powerdns import Comment, RRSet
+from functools import lru_cache
 from django.contrib.contenttypes.models import ContentType
 from dcim.models import Device, Interface
 from extras.choices import ObjectChangeActionChoices
-from extras.plugins.utils import get_plugin_config
 from extras.models import ObjectChange
 from ipam.models import IPAddress
 from virtualization.models import VirtualMachine, VMInterface
 
-from .constants import PLUGIN_NAME, FAMILY_TYPES, PTR_TYPE, PTR_ZONE_SUFFIXES
+from .config import SyncConfig
+from .constants import PTR_ZONE_SUFFIXES
+
+
+# max. number of distinct strings remembered by make_dns_label & make_dns_name
+LABEL_CACHE_SIZE = 8192
+
+_LABEL_INVALID_CHARS = re.compile(r"[^\w\s\-\/\._]")
+_LABEL_SEPARATORS = re.compile(r"[_\.\/\-\s]+")
 
 
 def get_ip_host(ip:IPAddress) -> Device|VirtualMachine|None:
@@ -24,14 +31,16 @@ def get_ip_host(ip:IPAddress) -> Device|VirtualMachine|None:
     return None
 
 
-def get_ip_ttl(ip: IPAddress) -> int|None:
+def get_ip_ttl(ip: IPAddress, config: SyncConfig|None = None) -> int|None:
     """
     Get TTL from IPAddress custom field if set. Else None.
+    Raw custom_field_data is used, since ip.cf loads custom field definitions
+    from database for each IPAddress instance.
     """
     ttl = None
-    ttl_cf = get_plugin_config(PLUGIN_NAME, "ttl_custom_field")
-    if ttl_cf and ttl_cf in ip.cf:
-        ttl = ip.cf.get(ttl_cf)
+    ttl_cf = (config or SyncConfig.load()).ttl_custom_field
+    if ttl_cf and ttl_cf in ip.custom_field_data:
+        ttl = ip.custom_field_data.get(ttl_cf)
         if ttl and not isinstance(ttl, int):
             raise ValueError(f"Custom field {ttl_cf} must be a positive integer")
         if ttl and ttl < 1:
@@ -39,34 +48,6 @@ def get_ip_ttl(ip: IPAddress) -> int|None:
     return ttl
 
 
-def can_manage_record(record: dict|RRSet) -> bool:
-    """
-    Check if record from powerdns is of supported type and if using comments,
-    check if it's correct
-    """
-    comment = get_plugin_config(PLUGIN_NAME, "powerdns_managed_record_comment")
-    managed_types = [PTR_TYPE] + list(FAMILY_TYPES.values())
-    if record["type"] not in managed_types:
-        return False
-    if comment:
-        for record_comment in record["comments"]:
-            if record_comment["content"] == comment:
-                return True
-        return False
-    return True
-
-
-def get_managed_comment() -> list:
-    """
-    Return powerdns RRset comment if set in confiuration
-    """
-    comment = get_plugin_config(PLUGIN_NAME, "powerdns_managed_record_comment")
-    if comment:
-        return [Comment(comment)]
-    else:
-        return []
-
-
 def make_canonical(name: str) -> str:
     """ Ensure string ends with a dot """
     if name[-1] != ".":
@@ -74,6 +55,7 @@ def make_canonical(name: str) -> str:
     return name
 
 
+@lru_cache(maxsize=LABEL_CACHE_SIZE)
 def make_dns_label(name: str) -> str:
     """
     Convert to ASCII. Convert spaces, dosts or slashes or repeated dashes to
@@ -81,10 +63,26 @@ def make_dns_label(name: str) -> str:
     hyphens or slashes. Convert to lowercase. Also strip leading and trailing
     whitespace, dashes, and underscores.
     (adapted from django's slugify function)
+    Results are cached, since the same interface & host names repeat a lot.
     """
     name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
-    name = re.sub(r"[^\w\s\-\/\._]", "", name.lower())
-    return re.sub(r"[_\.\/\-\s]+", "-", name).strip("-_")
+    name = _LABEL_INVALID_CHARS.sub("", name.lower())
+    return _LABEL_SEPARATORS.sub("-", name).strip("-_")
+
+
+@lru_cache(maxsize=LABEL_CACHE_SIZE)
+def make_dns_name(name: str) -> str:
+    """ Convert each dot separated part of (host) name with make_dns_label """
+    return ".".join(map(make_dns_label, name.split(".")))
+
+
+def label_cache_stats() -> dict[str, dict[str, int]]:
+    """ Hit & miss counters of make_dns_label and make_dns_name caches """
+    stats = {}
+    for key, func in (("label", make_dns_label), ("name", make_dns_name)):
+        info = func.cache_info()
+        stats[key] = {"hits": info.hits, "misses": info.misses}
+    return stats
 
 
 def is_reverse(name:str) -> bool:
@@ -1,23 +1,28 @@
 from django.contrib import messages
 from django.contrib.contenttypes.models import ContentType
 from django.db.models import Q
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.generic import View
 from core.models import Job
+from netbox.views import generic
 from utilities.htmx import is_htmx
 from utilities.rqworker import get_workers_for_queue
 from utilities.utils import normalize_querydict
 from utilities.views import ContentTypePermissionRequiredMixin
 
-from ..constants import JOB_NAME_DEVICE, JOB_NAME_INTERFACE, JOB_NAME_IP, JOB_NAME_SYNC
-from ..jobs import PowerdnsTaskFullSync
-from ..forms import ZoneScheduleForm
-from ..models import Zone
-from ..tables import SyncJobTable
+from ..constants import JOB_NAME_DEVICE, JOB_NAME_INTERFACE, JOB_NAME_IP, JOB_NAME_OUTBOX, JOB_NAME_SYNC, JOB_NAME_SYNC_ALL, JOB_NAME_SYNC_ALL_PLAN, JOB_NAME_SYNC_PLAN
+from ..jobs import PowerdnsTaskFullSync, PowerdnsTaskSyncAll
+from ..joblog import TAIL_LIMIT, tail_log, tail_output
+from .. import filtersets
+from ..forms import SyncActionFilterForm, ZoneScheduleForm
+from ..models import SyncAction, Zone
+from ..tables import SyncActionTable, SyncJobTable
 
 __all__ = (
+    "SyncActionListView",
     "SyncJobsView",
+    "SyncResultTailView",
     "SyncResultView",
     "SyncScheduleView",
 )
@@ -55,11 +60,14 @@ class SyncJobsView(ContentTypePermissionRequiredMixin, View):
         return "extras.view_script"
 
     def get(self, request):
-        query = Q(app_label="netbox_powerdns_sync", model="zone")|Q(app_label="ipam", model="ipaddress")
+        query = Q(app_label="netbox_powerdns_sync", model__in=("zone", "outboxentry"))|Q(app_label="ipam", model="ipaddress")
         object_types = ContentType.objects.filter(query)
         jobs = Job.objects.filter(
             object_type__in=object_types,
-            name__in=(JOB_NAME_DEVICE, JOB_NAME_INTERFACE, JOB_NAME_IP, JOB_NAME_SYNC),
+            name__in=(
+                JOB_NAME_DEVICE, JOB_NAME_INTERFACE, JOB_NAME_IP, JOB_NAME_OUTBOX,
+                JOB_NAME_SYNC, JOB_NAME_SYNC_ALL, JOB_NAME_SYNC_PLAN, JOB_NAME_SYNC_ALL_PLAN,
+            ),
         )
         jobs_table = SyncJobTable(
             data=jobs,
@@ -80,32 +88,66 @@ class SyncResultView(ContentTypePermissionRequiredMixin, View):
         return "extras.view_script"
 
     def get(self, request, job_pk):
-        #object_type = ContentType.objects.get_by_natural_key(app_label="extras", model="scriptmodule")
-        #job = get_object_or_404(Job.objects.all(), pk=job_pk, object_type=object_type)
         job = get_object_or_404(Job.objects.all(), pk=job_pk)
 
-        #module = job.object
-        #script = module.scripts[job.name]()
-
-        # If this is an HTMX request, return only the result HTML
+        # If this is an HTMX request, return only job status, log entries and
+        # output rows are polled by SyncResultTailView
         if is_htmx(request):
-            response = render(request, "netbox_powerdns_sync/htmx/sync_result.html", {
-                #"script": script,
+            response = render(request, "netbox_powerdns_sync/htmx/sync_status.html", {
                 "job": job,
             })
-            if job.completed or not job.started:
+            if job.completed:
                 response.status_code = 286
             return response
 
+        log_entries, log_offset = tail_log(job, 0)
+        output_rows, output_offset = tail_output(job, 0)
         return render(request, "netbox_powerdns_sync/sync_result.html", {
-            #"script": script,
             "job": job,
+            "log_entries": log_entries,
+            "log_offset": log_offset,
+            "log_more": len(log_entries) == TAIL_LIMIT,
+            "output_rows": output_rows,
+            "output_offset": output_offset,
+            "output_more": len(output_rows) == TAIL_LIMIT,
+        })
+
+
+class SyncResultTailView(ContentTypePermissionRequiredMixin, View):
+    """
+    Return log entries or output rows of a job added after offset given by
+    client, so polling a running job does not re-send what client already has.
+    """
+
+    def get_required_permission(self):
+        return "extras.view_script"
+
+    def get(self, request, job_pk, kind):
+        job = get_object_or_404(Job.objects.all(), pk=job_pk)
+        try:
+            offset = max(int(request.GET.get("offset", 0)), 0)
+        except ValueError:
+            offset = 0
+        if kind == "log":
+            rows, next_offset = tail_log(job, offset)
+        elif kind == "output":
+            rows, next_offset = tail_output(job, offset)
+        else:
+            raise Http404
+        return render(request, f"netbox_powerdns_sync/htmx/sync_{kind}_rows.html", {
+            "job": job,
+            "rows": rows,
+            "offset": next_offset,
+            "more": len(rows) == TAIL_LIMIT,
         })
 
 
 class SyncScheduleView(View):
     def get(self, request):
-        scheduled_jobs = Job.objects.filter(status="scheduled", name=JOB_NAME_SYNC)
+        scheduled_jobs = Job.objects.filter(
+            status="scheduled",
+            name__in=(JOB_NAME_SYNC, JOB_NAME_SYNC_ALL, JOB_NAME_SYNC_PLAN, JOB_NAME_SYNC_ALL_PLAN),
+        )
         jobs_table = SyncJobTable(
             data=scheduled_jobs,
             orderable=False,
@@ -125,19 +167,42 @@ class SyncScheduleView(View):
 
     def post(self, request):
         form = ZoneScheduleForm(request.POST, request.FILES)
-        
+        # "Plan" button computes changes without sending them to servers
+        plan = "_plan" in request.POST
+
         if not get_workers_for_queue("default"):
             messages.error(request, "Unable to run script: RQ worker process not running.")
+        elif form.is_valid() and form.cleaned_data["all_zones"]:
+            Job.enqueue(
+                PowerdnsTaskSyncAll.run_sync_all,
+                # job is not bound to a single zone
+                instance=Zone(),
+                name=JOB_NAME_SYNC_ALL_PLAN if plan else JOB_NAME_SYNC_ALL,
+                user=request.user,
+                schedule_at=form.cleaned_data.get("_schedule_at"),
+                interval=form.cleaned_data.get("_interval"),
+                plan=plan,
+            )
+            messages.success(request, f"Scheduled sync {'plan ' if plan else ''}job for all zones")
         elif form.is_valid():
             for zone in form.cleaned_data["zones"]:
                 Job.enqueue(
                     PowerdnsTaskFullSync.run_full_sync,
                     instance=zone,
-                    name=JOB_NAME_SYNC,
+                    name=JOB_NAME_SYNC_PLAN if plan else JOB_NAME_SYNC,
                     user=request.user,
                     schedule_at=form.cleaned_data.get("_schedule_at"),
                     interval=form.cleaned_data.get("_interval"),
+                    plan=plan,
                 )
-                messages.success(request, f"Scheduled sync job for zone {zone}")
+                messages.success(request, f"Scheduled sync {'plan ' if plan else ''}job for zone {zone}")
 
         return redirect("plugins:netbox_powerdns_sync:sync_jobs")
+
+
+class SyncActionListView(generic.ObjectListView):
+    queryset = SyncAction.objects.all()
+    filterset = filtersets.SyncActionFilterSet
+    filterset_form = SyncActionFilterForm
+    table = SyncActionTable
+    actions = ("export",)
@@ -0,0 +1,156 @@
+from typing import Iterable
+from dcim.models import Interface
+from ipam.models import IPAddress, FHRPGroup
+from virtualization.models import VMInterface
+
+from .reverse_index import ReverseZoneIndex
+from .utils import get_ip_host, make_canonical
+
+
+MATCH_FIELDS = (
+    "match_ipaddress_tags",
+    "match_interface_tags",
+    "match_device_tags",
+    "match_fhrpgroup_tags",
+    "match_device_roles",
+)
+
+
+class ZoneIndex:
+    """
+    In-memory index of zones keyed by zone name.
+
+    Finding the best zone for a name walks the name's labels from the longest
+    suffix to the shortest and does a dict lookup for each, so the cost
+    depends on the number of labels in the name and not on number of zones.
+    """
+    def __init__(self, zones: Iterable, stamp: tuple|None = None) -> None:
+        self.zones = {zone.name: zone for zone in zones}
+        self.stamp = stamp
+        self.reverse = ReverseZoneIndex(self.zones.values())
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    def get_best_zone(self, name: str) -> object|None:
+        """ Get the longest zone that name is in (or is equal to) """
+        if not name:
+            return None
+        name = make_canonical(name)
+        start = 0
+        while start < len(name):
+            zone = self.zones.get(name[start:])
+            if zone is not None:
+                return zone
+            start = name.find(".", start) + 1
+            if not start:
+                break
+        return None
+
+
+class ZoneMatcher:
+    """
+    In-memory copy of zone matchers (tags, roles, mgmt only & default).
+
+    It is loaded with a fixed number of queries and then resolves zones for
+    IP addresses from tag and role IDs, following the same precedence as
+    matching used to when querying the database for each IP.
+    """
+    def __init__(self, zones: Iterable, matchers: dict[str, dict[int, set[int]]]) -> None:
+        self.zones = {zone.pk: zone for zone in zones}
+        self.rank = {pk: i for i, pk in enumerate(sorted(self.zones, key=lambda pk: self.zones[pk].name))}
+        self.matchers = {field: matchers.get(field, {}) for field in MATCH_FIELDS}
+        self.mgmt_only = {pk for pk, zone in self.zones.items() if zone.match_interface_mgmt_only}
+        self.default = {pk for pk, zone in self.zones.items() if zone.is_default}
+
+    @classmethod
+    def load(cls, model) -> "ZoneMatcher":
+        """ Load zones and all their matchers, one query per matcher field """
+        matchers = {}
+        for field_name in MATCH_FIELDS:
+            field = model._meta.get_field(field_name)
+            values = field.remote_field.through.objects.values_list(
+                field.m2m_reverse_field_name(), field.m2m_field_name(),
+            )
+            matcher = {}
+            for related_id, zone_id in values:
+                matcher.setdefault(related_id, set()).add(zone_id)
+            matchers[field_name] = matcher
+        return cls(model.objects.all(), matchers)
+
+    def _lookup(self, field_name: str, ids: Iterable[int]) -> set[int]:
+        matcher = self.matchers[field_name]
+        zones = set()
+        for related_id in ids:
+            zones.update(matcher.get(related_id, ()))
+        return zones
+
+    def _filter_mgmt_only(self, zones: set[int], mgmt_only: bool) -> set[int]:
+        """ If IP is assigned to interface.mgmt_only=True, keep only zones constrained to mgmt only """
+        if not zones or not mgmt_only or zones.isdisjoint(self.mgmt_only):
+            return zones
+        return zones & self.mgmt_only
+
+    def _sorted(self, zones: set[int]) -> list:
+        return [self.zones[pk] for pk in sorted(zones, key=self.rank.__getitem__)]
+
+    def match(
+        self,
+        ip_tags: Iterable[int] = (),
+        interface_tags: Iterable[int]|None = None,
+        host_tags: Iterable[int] = (),
+        fhrpgroup_tags: Iterable[int]|None = None,
+        role: int|None = None,
+        mgmt_only: bool = False,
+    ) -> list:
+        """
+        Return zones matching given tag and role IDs ordered by name.
+        interface_tags is None when IP is not assigned to an (VM)interface,
+        fhrpgroup_tags is None when IP is not assigned to a FHRP group.
+        """
+        zones = self._filter_mgmt_only(self._lookup("match_ipaddress_tags", ip_tags), mgmt_only)
+        if zones:
+            return self._sorted(zones)
+        if interface_tags is not None:
+            zones = self._filter_mgmt_only(self._lookup("match_interface_tags", interface_tags), mgmt_only)
+            if zones:
+                return self._sorted(zones)
+            zones = self._filter_mgmt_only(self._lookup("match_device_tags", host_tags), mgmt_only)
+            if zones:
+                return self._sorted(zones)
+        if fhrpgroup_tags is not None:
+            zones = self._filter_mgmt_only(self._lookup("match_fhrpgroup_tags", fhrpgroup_tags), mgmt_only)
+            if zones:
+                return self._sorted(zones)
+        if role:
+            zones = self._filter_mgmt_only(self._lookup("match_device_roles", (role,)), mgmt_only)
+            if zones:
+                return self._sorted(zones)
+        zones = self._filter_mgmt_only(self.default, mgmt_only)
+        return self._sorted(zones)
+
+    def match_ip(self, ip: IPAddress) -> list:
+        """
+        Return zones matching IPAddress. Tags are read with .all() so no
+        queries are made if they were prefetched.
+        """
+        assigned_object = ip.assigned_object
+        interface_tags = None
+        host_tags = ()
+        fhrpgroup_tags = None
+        role = None
+        if isinstance(assigned_object, (Interface, VMInterface)):
+            host = get_ip_host(ip)
+            interface_tags = [tag.pk for tag in assigned_object.tags.all()]
+            host_tags = [tag.pk for tag in host.tags.all()]
+            role = host.role_id
+        elif isinstance(assigned_object, FHRPGroup):
+            fhrpgroup_tags = [tag.pk for tag in assigned_object.tags.all()]
+        return self.match(
+            ip_tags=[tag.pk for tag in ip.tags.all()],
+            interface_tags=interface_tags,
+            host_tags=host_tags,
+            fhrpgroup_tags=fhrpgroup_tags,
+            role=role,
+            mgmt_only=isinstance(assigned_object, Interface) and assigned_object.mgmt_only,
+        )